@@ -0,0 +1,66 @@
+"""
+bench_event_backlog.py
+
+Measure the cost of a GetEvent reply for a user with a 200 event backlog who
+keeps polling without acknowledging anything.  Compares rebuilding the
+GetEventResult proto from every queued event against the cached wire bytes
+kept by server.models.events.EventQueue.
+
+Usage: python benchmarks/bench_event_backlog.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import tbmatch.event_pb2
+
+BACKLOG = 200
+ITERATIONS = 2000
+
+def MakeLobbyUpdate(i):
+    event = tbmatch.event_pb2.Event()
+    event.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
+    event.lobby_update.lobby_id = 1234
+    member = event.lobby_update.update.add()
+    member.account_id = 1000 + i % 8
+    member.handle = 'User %03d' % (i % 8)
+    member.ready = i % 2 == 0
+    event.lobby_update.queue.extend(range(1000, 1008))
+    return event
+
+def Before(events):
+    response = tbmatch.event_pb2.GetEventResult()
+    response.version = str(events[-1].event_id)
+    for event in events:
+        response.event.add().CopyFrom(event)
+    return response.SerializeToString()
+
+def Main():
+    events = []
+    user = server.models.users.User()
+    for i in xrange(BACKLOG):
+        event = MakeLobbyUpdate(i)
+        user.SendEvent(event)
+        event.event_id = server.GetNextUniqueId()
+        events.append(event)
+
+    def Uncached():
+        user.events.encoded_events = None
+        return user.events.EncodeResult()
+
+    timings = [
+        ('rebuild GetEventResult proto', lambda: Before(events)),
+        ('join encoded events', Uncached),
+        ('cached (poll without ack)', lambda: user.events.EncodeResult()),
+    ]
+    print '{0} queued events, {1} bytes per reply'.format(BACKLOG, len(user.events.EncodeResult()))
+    for name, fn in timings:
+        elapsed = timeit.timeit(fn, number=ITERATIONS)
+        print '{0:<32} {1:>9.2f} us/poll'.format(name, elapsed * 1e6 / ITERATIONS)
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,74 @@
+"""
+bench_event_fanout.py
+
+Measure the cost of broadcasting a lobby update to every member and delivering
+it in each member's next GetEvent reply.  Compares copying the proto for every
+recipient (and again into the GetEventResult) against serializing the event
+once and sharing the bytes.
+
+Usage: python benchmarks/bench_event_fanout.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.events
+import tbmatch.event_pb2
+
+ITERATIONS = 2000
+
+def MakeLobbyUpdate(members):
+    event = tbmatch.event_pb2.Event()
+    event.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
+    event.lobby_update.lobby_id = 1234
+    for i in xrange(members):
+        member = event.lobby_update.update.add()
+        member.account_id = 1000 + i
+        member.handle = 'User %03d' % i
+        member.ready = i % 2 == 0
+        event.lobby_update.queue.append(1000 + i)
+    return event
+
+def Before(queues, event):
+    # copy the proto into every recipient's queue...
+    for queue in queues:
+        e = tbmatch.event_pb2.Event()
+        e.CopyFrom(event)
+        e.event_id = server.GetNextUniqueId()
+        queue.append(e)
+
+    # ...then copy it again into each recipient's GetEventResult.
+    for queue in queues:
+        response = tbmatch.event_pb2.GetEventResult()
+        response.version = str(queue[-1].event_id)
+        for e in queue:
+            response.event.add().CopyFrom(e)
+        response.SerializeToString()
+        del queue[:]
+
+def After(users, event):
+    encoded = server.models.events.EncodeEvent(event)
+    for user in users:
+        user.SendEvent(encoded)
+
+    for user in users:
+        user.events.EncodeResult()
+        user.events.Acknowledge(user.events.GetLastEventId())
+
+def Main():
+    for members in (2, 8, 16):
+        event = MakeLobbyUpdate(members)
+        queues = [[] for _ in xrange(members)]
+        users = [server.models.users.User() for _ in xrange(members)]
+
+        before = timeit.timeit(lambda: Before(queues, event), number=ITERATIONS) * 1e6 / ITERATIONS
+        after = timeit.timeit(lambda: After(users, event), number=ITERATIONS) * 1e6 / ITERATIONS
+        print '{0:>2} members: before {1:>8.2f} us/broadcast  after {2:>8.2f} us/broadcast  ({3:.1f}x)'.format(
+            members, before, after, before / after)
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,94 @@
+"""
+bench_lobby_encoding.py
+
+Measure encoding lobby events for a full lobby.  Compares building the
+E_LOBBY_JOIN and E_LOBBY_UPDATE protos from scratch, as every join and ready
+change used to, against the cached state and delta updates in
+server.models.lobbies.Lobby.  Also checks both give the same lobby.
+
+Usage: python benchmarks/bench_lobby_encoding.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.config
+import server.models.users
+import server.models.events
+import server.models.lobbies
+import tbmatch.event_pb2
+
+ROUNDS = 5000
+
+def EncodeStateFromScratch(lobby):
+    state = lobby.EncodeHeader()
+    for m in lobby.members.values():
+        member = state.member.add()
+        member.account_id = m.user.user_id
+        member.handle = m.user.handle
+        member.owner = m.user.user_id == lobby.owner_user_id
+        member.ready = m.ready
+
+    for user_id in lobby.queue:
+        state.queue.extend([user_id])
+
+    return state
+
+def EncodeJoinFromScratch(lobby):
+    event = tbmatch.event_pb2.Event()
+    event.type = tbmatch.event_pb2.Event.E_LOBBY_JOIN
+    event.lobby_join.lobby.CopyFrom(EncodeStateFromScratch(lobby))
+    return server.models.events.EncodeEvent(event)
+
+def EncodeUpdateFromScratch(lobby, member):
+    event = tbmatch.event_pb2.Event()
+    event.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
+    event.lobby_update.lobby_id = lobby.lobby_id
+    event.lobby_update.queue.extend(lobby.queue)
+    member.EncodeState(event.lobby_update.update.add())
+    return server.models.events.EncodeEvent(event)
+
+def Main():
+    lobbies = server.models.lobbies.Lobbies()
+    lobby = lobbies.CreateLobby('bench', None)
+    sent = []
+    for _ in xrange(lobbies.GetMaxMembers()):
+        user = server.models.users.User()
+        user.SendEvent = sent.append
+        lobby.AddUser(user)
+    members = lobby.members.values()
+
+    # the cached state parses to the same lobby as the one built from scratch.
+    parsed = tbmatch.event_pb2.Event()
+    parsed.ParseFromString(server.models.events.EncodeEventWithPayload(
+        tbmatch.event_pb2.Event.E_LOBBY_JOIN, server.models.lobbies.EVENT_LOBBY_JOIN_FIELD,
+        server.models.events.EncodeLengthDelimited(server.models.lobbies.LOBBY_JOIN_LOBBY_TAG, lobby.GetEncodedState())).body)
+    assert parsed.lobby_join.lobby == EncodeStateFromScratch(lobby)
+
+    # one member changes, then someone joins and needs the whole lobby.
+    start = time.time()
+    for i in xrange(ROUNDS):
+        member = members[i % len(members)]
+        member.ready = not member.ready
+        EncodeUpdateFromScratch(lobby, member)
+        EncodeJoinFromScratch(lobby)
+    before = (time.time() - start) * 1e6 / ROUNDS
+
+    start = time.time()
+    for i in xrange(ROUNDS):
+        member = members[i % len(members)]
+        member.ready = not member.ready
+        member.Changed()
+        lobby.SendUpdate([member])
+        lobby.GetEncodedState()
+    after = (time.time() - start) * 1e6 / ROUNDS
+
+    print '{0} members, one change then one full state per round'.format(len(members))
+    print 'from scratch {0:>8.2f} us/round'.format(before)
+    print 'cached       {0:>8.2f} us/round  ({1:.1f}x)'.format(after, before / after)
+
+if __name__ == '__main__':
+    Main()
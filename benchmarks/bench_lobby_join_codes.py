@@ -0,0 +1,55 @@
+"""
+bench_lobby_join_codes.py
+
+Measure handing out lobby join codes as the code space fills up, for a short
+code length where every code gets used and for the default length with 50k
+live lobbies.  Also checks no code is handed out twice.
+
+Usage: python benchmarks/bench_lobby_join_codes.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.config
+import server.models.lobbies
+
+LIVE_LOBBIES = 50000
+
+def Fill(length, count):
+    in_use = {}
+    allocator = server.models.lobbies.JoinCodeAllocator(length, in_use)
+    count = min(count, allocator.size)
+    checkpoints = set([count / 2, count * 9 / 10, count - 1])
+    start = time.time()
+    last = start
+    done = 0
+    for i in xrange(count):
+        code = allocator.Allocate()
+        assert code not in in_use
+        in_use[code] = True
+        if i in checkpoints:
+            now = time.time()
+            print '  {0:>6} in use ({1:.3%} of the codes): {2:>6.2f} us/code'.format(i + 1, float(i + 1) / allocator.size, (now - last) * 1e6 / (i + 1 - done))
+            last = now
+            done = i + 1
+    return allocator, in_use
+
+def Main():
+    print 'length 3, every code'
+    allocator, in_use = Fill(3, 26 ** 3)
+
+    # close a lobby and its code comes straight back.
+    code = in_use.popitem()[0]
+    allocator.Release(code)
+    assert allocator.Allocate() == code
+
+    length = server.config.lobby_service_config.join_code_length
+    print 'length {0}, {1} live lobbies'.format(length, LIVE_LOBBIES)
+    Fill(length, LIVE_LOBBIES)
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,67 @@
+"""
+bench_lobby_lookup.py
+
+Measure finding a user's lobby and finding a lobby by join code with 50k live
+lobbies of two users each.  Compares the old scan over every lobby against the
+indexes kept by server.models.lobbies.Lobbies.
+
+Usage: python benchmarks/bench_lobby_lookup.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.lobbies
+
+LOBBIES = 50000
+LOOKUPS = 200
+
+def ScanForUser(lobbies, user):
+    for _, lobby in lobbies.lobbies.iteritems():
+        if user.user_id in lobby.members:
+            return lobby
+
+def ScanForCode(lobbies, code):
+    for _, lobby in lobbies.lobbies.iteritems():
+        if lobby.join_code.lower() == code.lower():
+            return lobby
+
+def Time(fn, args):
+    start = time.time()
+    for arg in args:
+        fn(arg)
+    return (time.time() - start) * 1e6 / len(args)
+
+def Main():
+    lobbies = server.models.lobbies.Lobbies()
+    users = []
+    for _ in xrange(LOBBIES):
+        lobby = lobbies.CreateLobby('bench', None)
+        for _ in xrange(2):
+            user = server.models.users.User()
+            # only measure the lookups, not the lobby events.
+            user.SendEvent = lambda e: None
+            lobby.AddUser(user)
+            users.append(user)
+
+    rng = random.Random(1)
+    sample_users = [rng.choice(users) for _ in xrange(LOOKUPS)]
+    sample_codes = [lobbies.FindLobbyWithUser(user).join_code.lower() for user in sample_users]
+    for user, code in zip(sample_users, sample_codes):
+        assert ScanForUser(lobbies, user) is lobbies.FindLobbyWithUser(user)
+        assert ScanForCode(lobbies, code) is lobbies.FindLobbyWithCode(code)
+
+    print '{0} lobbies, {1} users'.format(LOBBIES, len(users))
+    for name, scan, index, args in (('by user', ScanForUser, lobbies.FindLobbyWithUser, sample_users),
+                                    ('by code', ScanForCode, lobbies.FindLobbyWithCode, sample_codes)):
+        before = Time(lambda arg: scan(lobbies, arg), args)
+        after = Time(index, args)
+        print '{0}: scan {1:>10.2f} us  index {2:>6.2f} us  ({3:.0f}x)'.format(name, before, after, before / after)
+
+if __name__ == '__main__':
+    Main()
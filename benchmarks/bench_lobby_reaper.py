@@ -0,0 +1,89 @@
+"""
+bench_lobby_reaper.py
+
+Run the lobby reaper against a steady stream of lobbies, on a virtual clock, and
+report how many lobbies are kept around and what each reap pass costs.  Most
+lobbies are abandoned by players who never leave or log out, a few are closed
+properly and the rest keep playing for a while before they're abandoned too.
+Without the reaper every abandoned lobby would be kept forever.
+
+Usage: python benchmarks/bench_lobby_reaper.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.config
+import server.models.users
+import server.models.expiring
+import server.models.lobbies
+import tbmatch.lobby_pb2
+
+HOURS = 6
+LOBBIES_PER_SEC = 2
+LEAVE_RATE = 0.2
+BUSY_RATE = 0.2
+BUSY_SECS = 5400
+
+def Main():
+    rng = random.Random(1)
+    now = [time.time()]
+    lobbies = server.models.lobbies.Lobbies()
+    lobbies.clock = lambda: now[0]
+    lobbies.reap_wheel = server.models.expiring.TimerWheel(server.config.lobby_reap_period_ms / 1000.0, now[0])
+
+    # lobbies players are still busy in, by when they'll stop
+    busy = {}
+    reap_ms = []
+    step = server.config.lobby_reap_period_ms / 1000.0
+    ttl = server.config.lobby_config.lobby_ttl
+    print '{0} hours, {1} lobbies/s, lobby_ttl {2}s'.format(HOURS, LOBBIES_PER_SEC, ttl)
+    for tick in xrange(int(HOURS * 3600 / step)):
+        now[0] += step
+        for _ in xrange(int(LOBBIES_PER_SEC * step)):
+            lobby = lobbies.CreateLobby('bench', None)
+            for _ in xrange(2):
+                user = server.models.users.User()
+                user.SendEvent = lambda e: None
+                # still logged in, so the reaper leaves them be.
+                user.session_key = str(user.user_id)
+                server.users.users[user.session_key] = user
+                lobby.AddUser(user)
+            pick = rng.random()
+            if pick < LEAVE_RATE:
+                for m in lobby.members.values():
+                    lobbies.RemoveUserFromLobby(m.user)
+            elif pick < LEAVE_RATE + BUSY_RATE:
+                busy[lobby] = now[0] + rng.uniform(0, BUSY_SECS)
+
+        # the busy ones have something going on every so often.
+        for lobby, until in busy.items():
+            if until < now[0]:
+                del busy[lobby]
+            elif rng.random() < step / 60.0:
+                member = lobby.members.itervalues().next()
+                lobby.SetUserReady(member.user, not member.ready, tbmatch.lobby_pb2.LobbySetReadyRequest().character)
+
+        start = time.clock()
+        lobbies.Reap()
+        reap_ms.append((time.clock() - start) * 1000)
+
+        if (tick + 1) % int(1800 / step) == 0:
+            print '  {0:>5.1f}h: {1:>6} lobbies, {2:>6} users, {3:>6} on the wheel'.format(
+                (tick + 1) * step / 3600, len(lobbies.lobbies), len(lobbies.lobbies_by_user), len(lobbies.reap_wheel))
+
+    # only lobbies used within the last lobby_ttl (and a tick) are left.
+    for lobby in lobbies.lobbies.itervalues():
+        assert now[0] - lobby.last_activity <= ttl + 2 * step
+    assert len(lobbies.reap_wheel) == len(lobbies.lobbies)
+
+    reap_ms.sort()
+    print 'reap pass ms: p50 {0:.3f}, p99 {1:.3f}, max {2:.3f}'.format(
+        reap_ms[len(reap_ms) / 2], reap_ms[len(reap_ms) * 99 / 100], reap_ms[-1])
+
+if __name__ == '__main__':
+    Main()
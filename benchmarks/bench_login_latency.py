@@ -0,0 +1,120 @@
+"""
+bench_login_latency.py
+
+Load test: measure portal ping test round trips while many clients log in at
+once.  Logins used to sleep on the ioloop while redeeming their game session
+ticket, which stalled every UDP socket in the portal for the duration.
+
+Unlike the other benchmarks this one needs a server running on localhost
+(python rtd.py).
+
+Usage: python benchmarks/bench_login_latency.py [concurrent-logins]
+"""
+
+import os
+import sys
+import time
+import random
+import socket
+import struct
+import threading
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import requests
+import server.config
+import tbmatch.match_pb2
+import tbmatch.session_pb2
+import tbrpc.tbrpc_pb2
+
+URL = 'http://localhost:1337/_01/rpc/'
+PORTAL_VERSION = 0x8012
+MSG_PING_READY = 67
+MSG_PING = 68
+
+def Rpc(session, name, request, response):
+    r = session.post(URL + name, data=request.SerializeToString())
+    if r.status_code != 200:
+        raise RuntimeError('{0} failed'.format(name))
+    result = tbrpc.tbrpc_pb2.Result()
+    result.ParseFromString(r.content)
+    response.ParseFromString(result.content)
+    return response
+
+def Login():
+    session = requests.Session()
+    request = tbmatch.session_pb2.LoginRequest()
+    request.login = 'loadtest%d' % random.randint(0, 1 << 30)
+    Rpc(session, 'Login', request, tbrpc.tbrpc_pb2.Empty())
+
+    request = tbmatch.session_pb2.GetGameSessionTicketRequest()
+    request.game = tbmatch.session_pb2.GT_RISING_THUNDER
+    ticket = Rpc(session, 'GetGameSessionTicket', request, tbmatch.session_pb2.GetGameSessionTicketResult())
+    Rpc(session, 'Logout', tbrpc.tbrpc_pb2.Empty(), tbrpc.tbrpc_pb2.Empty())
+
+    request = tbmatch.session_pb2.RedeemGameSessionTicketRequest()
+    request.nonce = ticket.nonce
+    request.game = tbmatch.session_pb2.GT_RISING_THUNDER
+    Rpc(session, 'RedeemGameSessionTicket', request, tbrpc.tbrpc_pb2.Empty())
+    return session
+
+def PingTest(session):
+    """
+    Run one portal ping test and return the round trip time of every ping in seconds.
+    """
+    config = Rpc(session, 'PingTest', tbrpc.tbrpc_pb2.Empty(), tbmatch.match_pb2.PingTestResult()).config
+    addr = (config.server.host_name, config.server.port)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(2)
+    client_rand = random.randint(0, 65535)
+    rtts = []
+    try:
+        sent = time.time()
+        sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_PING_READY) + struct.pack('QH', config.secret, client_rand), addr)
+        while len(rtts) < server.config.portal_ping_count:
+            data, _ = sock.recvfrom(2048)
+            rtts.append(time.time() - sent)
+            _, server_rand = struct.unpack('HH', data[3:])
+            sent = time.time()
+            sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_PING) + struct.pack('HH', client_rand, server_rand), addr)
+    except socket.timeout:
+        pass
+    finally:
+        sock.close()
+    return rtts
+
+def Percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def Measure(name, session, duration):
+    rtts = []
+    end = time.time() + duration
+    while time.time() < end:
+        rtts.extend(PingTest(session))
+    rtts = [r * 1000 for r in rtts]
+    print '{0:<24} pings:{1:>5}  p50:{2:>7.2f}ms  p99:{3:>7.2f}ms  max:{4:>7.2f}ms'.format(
+        name, len(rtts), Percentile(rtts, 0.5), Percentile(rtts, 0.99), max(rtts))
+
+def Main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    session = Login()
+    Measure('idle', session, 3)
+
+    running = [True]
+    def LoginLoop():
+        while running[0]:
+            Login()
+
+    threads = [threading.Thread(target=LoginLoop) for _ in xrange(concurrency)]
+    for t in threads:
+        t.start()
+    try:
+        Measure('%d concurrent logins' % concurrency, session, 5)
+    finally:
+        running[0] = False
+        for t in threads:
+            t.join()
+
+if __name__ == '__main__':
+    Main()
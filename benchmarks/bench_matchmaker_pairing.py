@@ -0,0 +1,95 @@
+"""
+bench_matchmaker_pairing.py
+
+Compare the greedy and 'optimal' pairing modes in server.models.matchscore on
+pools of queue tickets: how many pairs each finds, their total score and rating
+difference, and how long each takes.  If networkx is installed, its maximum
+weight matching is shown as well, as a check on the optimal pairs.  Pools bigger
+than matchmaker_optimal_pool_max usually run out of matchmaker_optimal_budget_ms
+and come back greedy.
+
+Usage: python benchmarks/bench_matchmaker_pairing.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.matchmaker
+import server.models.matchscore
+import tbmatch.match_pb2
+
+try:
+    import networkx
+except ImportError:
+    networkx = None
+
+POOLS = 20
+
+def MakePool(rng, size, now):
+    gameplay_options = tbmatch.match_pb2.GetMatchRequest()
+    pool = []
+    for _ in xrange(size):
+        user = server.models.users.User()
+        user.rating = rng.gauss(1500, 300)
+        queue_user = server.models.matchmaker.QueueUser(user, gameplay_options)
+        queue_user.join_time = now - rng.expovariate(1 / 3.0)
+        pool.append(queue_user)
+    pool.sort(key=lambda q: q.join_time)
+    return pool
+
+def IsCompatible(a, b):
+    # stands in for the matchmaker's other filters, turning down some pairs.
+    return (a.user.user_id + b.user.user_id) % 5 != 0
+
+def PickPairsExact(pool, now, is_compatible):
+    scores = server.models.matchscore.ScoreMatrixPython(pool, now)
+    graph = networkx.Graph()
+    for i in xrange(len(pool)):
+        for j in xrange(i + 1, len(pool)):
+            if scores[i][j] != server.models.matchscore.INVALID and is_compatible(pool[i], pool[j]):
+                # every pair is worth more than any difference in score, so the most
+                # pairs wins first.
+                graph.add_edge(i, j, weight=1000.0 - scores[i][j])
+    return [(pool[min(i, j)], pool[max(i, j)]) for i, j in networkx.max_weight_matching(graph, maxcardinality=True)]
+
+def Measure(fn, pools, now):
+    pairs = 0
+    score = 0.0
+    rating_diff = 0.0
+    start = time.time()
+    results = [fn(pool, now, IsCompatible) for pool in pools]
+    elapsed = (time.time() - start) * 1000 / len(pools)
+    for pool, result in zip(pools, results):
+        scores = server.models.matchscore.ScoreMatrixPython(pool, now)
+        index = dict((id(q), i) for i, q in enumerate(pool))
+        for a, b in result:
+            pairs += 1
+            score += scores[index[id(a)]][index[id(b)]]
+            rating_diff += abs(a.rating - b.rating)
+    return '{0:>6.1f} pairs  score {1:>7.1f}  rating diff {2:>6.1f}  {3:>8.2f} ms'.format(
+        float(pairs) / len(pools), score / len(pools), rating_diff / max(pairs, 1), elapsed)
+
+def Main():
+    rng = random.Random(1)
+    now = time.time()
+    budget = server.config.matchmaker_optimal_budget_ms
+    modes = [
+        ('greedy', lambda pool, now, c: server.models.matchscore.PickPairsPython(pool, now, c)),
+        ('optimal', lambda pool, now, c: server.models.matchscore.PickPairsOptimal(pool, now, c, budget)),
+    ]
+    if networkx:
+        modes.append(('exact', PickPairsExact))
+
+    for size in (16, 32, 64):
+        pools = [MakePool(rng, size, now) for _ in xrange(POOLS)]
+        print '{0} tickets'.format(size)
+        for name, fn in modes:
+            print '  {0:<8} {1}'.format(name, Measure(fn, pools, now))
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,79 @@
+"""
+bench_matchmaker_poll.py
+
+Measure one matchmaker pass over a queue of 20k tickets with ratings spread
+around 1500 and waits of up to a minute, first with nobody having done a ping
+test, then with pings spread over a few regions so the ping window turns most
+candidates away.  Only the pairing is timed, not starting the game sessions.
+
+Usage: python benchmarks/bench_matchmaker_poll.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.matchmaker
+import tbmatch.match_pb2
+
+TICKETS = 20000
+PASSES = 20
+
+# (share of players, typical ping to the server in ms), as in bench_matchmaker_sim.
+REGIONS = [
+    (0.45, 40),
+    (0.35, 110),
+    (0.15, 180),
+    (0.05, 220),
+]
+
+def GetPing(rng):
+    roll = rng.random()
+    for share, ping in REGIONS:
+        if roll < share:
+            break
+        roll -= share
+    return int(max(5, rng.gauss(ping, ping / 4.0)))
+
+def FillQueue(rng, max_wait, pings):
+    matchmaker = server.models.matchmaker.Matchmaker()
+    gameplay_options = tbmatch.match_pb2.GetMatchRequest()
+    now = time.time()
+    for _ in xrange(TICKETS):
+        user = server.models.users.User()
+        user.rating = rng.gauss(1500, 300)
+        queue_user = server.models.matchmaker.QueueUser(user, gameplay_options)
+        queue_user.join_time = now - rng.uniform(0, max_wait)
+        if pings:
+            queue_user.ping = GetPing(rng)
+        matchmaker.AddQueueUser(queue_user)
+    return matchmaker, now
+
+def Main():
+    rng = random.Random(1)
+    print '{0} tickets, select_size {1}, {2} candidates per poll'.format(TICKETS, server.config.match_queue_config.select_size, server.config.matchmaker_candidates_per_pass)
+    for pings in (False, True):
+        for max_wait in (0, 5, 60):
+            poll_ms = []
+            matched = 0
+            for _ in xrange(PASSES):
+                matchmaker, now = FillQueue(rng, max_wait, pings)
+                start = time.time()
+                matches, rest = matchmaker.FindMatches(now)
+                poll_ms.append((time.time() - start) * 1000)
+                while rest:
+                    # the rest get picked up by the polls straight after.
+                    start = time.time()
+                    found, rest = matchmaker.FindOpponents(rest, now)
+                    poll_ms.append((time.time() - start) * 1000)
+                    matches += found
+                matched += len(matches)
+            print '{0:<8} waits up to {1:>2}s: {2:>6.2f} ms/pass, {3:>4.1f} polls/pass, {4:>6.2f} ms max poll, {5:>5.1f} matches/pass'.format(
+                'pings' if pings else 'no pings', max_wait, sum(poll_ms) / PASSES, float(len(poll_ms)) / PASSES, max(poll_ms), float(matched) / PASSES)
+
+if __name__ == '__main__':
+    Main()
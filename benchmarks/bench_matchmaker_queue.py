@@ -0,0 +1,70 @@
+"""
+bench_matchmaker_queue.py
+
+Measure join/cancel churn against a matchmaking queue holding 50k users.
+Compares the old list (insert at the front, linear scan to cancel) against
+the OrderedDict keyed by user_id used by server.models.matchmaker.Matchmaker.
+
+Usage: python benchmarks/bench_matchmaker_queue.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.matchmaker
+import tbmatch.match_pb2
+
+QUEUED = 50000
+CHURN = 2000
+
+class ListQueue(object):
+    def __init__(self):
+        self.queue_users = []
+
+    def JoinQueue(self, user, gameplay_options):
+        self.queue_users.insert(0, server.models.matchmaker.QueueUser(user, gameplay_options))
+
+    def LeaveQueue(self, user):
+        for u in self.queue_users:
+            if u.user.user_id == user.user_id:
+                self.queue_users.remove(u)
+                return
+
+def Churn(matchmaker, users, gameplay_options):
+    # everyone waiting, then random users cancel and rejoin at the back.
+    for user in users:
+        matchmaker.JoinQueue(user, gameplay_options)
+
+    rng = random.Random(1)
+    start = time.time()
+    for _ in xrange(CHURN):
+        user = rng.choice(users)
+        matchmaker.LeaveQueue(user)
+        matchmaker.JoinQueue(user, gameplay_options)
+    return (time.time() - start) * 1e6 / CHURN
+
+def Main():
+    users = []
+    for i in xrange(QUEUED):
+        user = server.models.users.User()
+        user.user_id = i + 1
+        # only measure the queue, not the WAITING/CANCEL events.
+        user.SendEvent = lambda e: None
+        users.append(user)
+    gameplay_options = tbmatch.match_pb2.GetMatchRequest()
+
+    before = Churn(ListQueue(), users, gameplay_options)
+    matchmaker = server.models.matchmaker.Matchmaker()
+    matchmaker.SchedulePoll = lambda: None
+    after = Churn(matchmaker, users, gameplay_options)
+    print '{0} queued users, {1} cancel/rejoin pairs'.format(QUEUED, CHURN)
+    print 'list        {0:>10.2f} us/pair'.format(before)
+    print 'ordereddict {0:>10.2f} us/pair  ({1:.0f}x)'.format(after, before / after)
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,64 @@
+"""
+bench_matchmaker_scoring.py
+
+Measure scoring and greedily pairing a pool of queue tickets, as the
+matchmaker does with its selection every pass.  Compares the pure Python
+reference in server.models.matchscore against the NumPy version and checks
+both pick the same pairs, ignoring the order they're returned in.
+
+Usage: python benchmarks/bench_matchmaker_scoring.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.users
+import server.models.matchmaker
+import server.models.matchscore
+import tbmatch.match_pb2
+
+ITERATIONS = 10
+
+def MakePool(rng, size, now):
+    gameplay_options = tbmatch.match_pb2.GetMatchRequest()
+    pool = []
+    for _ in xrange(size):
+        user = server.models.users.User()
+        user.rating = rng.gauss(1500, 300)
+        queue_user = server.models.matchmaker.QueueUser(user, gameplay_options)
+        queue_user.join_time = now - rng.uniform(0, 10)
+        pool.append(queue_user)
+    pool.sort(key=lambda q: q.join_time)
+    return pool
+
+def IsCompatible(a, b):
+    # stands in for the matchmaker's other filters, turning down some pairs.
+    return (a.user.user_id + b.user.user_id) % 7 != 0
+
+def Time(fn, pool, now):
+    start = time.time()
+    for _ in xrange(ITERATIONS):
+        pairs = fn(pool, now, IsCompatible)
+    return (time.time() - start) * 1000 / ITERATIONS, sorted((a.user.user_id, b.user.user_id) for a, b in pairs)
+
+def Main():
+    if not server.models.matchscore.numpy:
+        print 'NumPy is not installed.'
+        return
+
+    rng = random.Random(1)
+    now = time.time()
+    for size in (50, 200, 400):
+        pool = MakePool(rng, size, now)
+        before, python_pairs = Time(server.models.matchscore.PickPairsPython, pool, now)
+        after, numpy_pairs = Time(server.models.matchscore.PickPairsNumpy, pool, now)
+        assert python_pairs == numpy_pairs
+        print '{0:>3} tickets: python {1:>8.2f} ms  numpy {2:>8.2f} ms  ({3:.1f}x), {4} pairs'.format(
+            size, before, after, before / after, len(numpy_pairs))
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,230 @@
+"""
+bench_matchmaker_sim.py
+
+Run the matchmaker offline against a made up population of players, on a
+virtual clock, and report how it did.  Good for trying out MatchQueueConfig
+changes and for catching performance regressions without running the server.
+
+Players arrive as a Poisson process.  Each gets a rating, a region and a ping
+to the server which depends on the region, and gives up waiting after an
+exponentially distributed time.  The real Matchmaker does the matching, polling
+every poll_period_ms and shortly after anyone joins, exactly as the server
+would.  A stub portal stands in for game sessions: some fail their handshake,
+and those players resume their place in the queue.  The rest play a game and
+some of them come back for another.
+
+Reports matches per minute, the CPU time of each poll, how long players waited
+and how good their matches were.
+
+Usage: python benchmarks/bench_matchmaker_sim.py [--sim_minutes=10] [--sim_arrivals_per_sec=20] ...
+       python benchmarks/bench_matchmaker_sim.py --help
+"""
+
+import os
+import sys
+import time
+import heapq
+import random
+import tornado.options
+
+tornado.options.define('sim_minutes', default=10.0, help='how much virtual time to simulate')
+tornado.options.define('sim_arrivals_per_sec', default=20.0, help='mean rate players join the queue')
+tornado.options.define('sim_patience_secs', default=120.0, help='mean time a player waits before canceling')
+tornado.options.define('sim_rating_sd', default=300.0, help='standard deviation of player ratings around 1500')
+tornado.options.define('sim_handshake_fail_rate', default=0.02, help='fraction of matches whose handshake fails')
+tornado.options.define('sim_replay_rate', default=0.5, help='fraction of players who queue again after a game')
+tornado.options.define('sim_game_secs', default=180.0, help='mean length of a game')
+tornado.options.define('sim_seed', default=1, help='random seed')
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.config
+import server.models.users
+import server.models.matchmaker
+import tbmatch.match_pb2
+import tbportal.portal_pb2
+
+options = tornado.options.options
+
+# (name, share of players, typical ping to the server in ms)
+REGIONS = [
+    ('na', 0.45, 40),
+    ('eu', 0.35, 110),
+    ('asia', 0.15, 180),
+    ('oce', 0.05, 220),
+]
+
+# How long the stub portal takes to decide a handshake failed.
+HANDSHAKE_SECS = 5.0
+
+# How long a player takes to ask for their place back after a failed handshake.
+RESUME_SECS = 1.0
+
+# Queue time and match quality percentiles to report.
+PERCENTILES = (50, 90, 99)
+
+class StubPortal(object):
+    """
+    Stands in for server.portal.  Remembers who was matched so the simulation can
+    decide how each match turns out.
+    """
+    def __init__(self):
+        self.started = []
+
+    def StartGameSession(self, game_session, game_config, p1, p2):
+        self.started.append((game_config.match_id, p1, p2))
+        return 0, 0
+
+class Simulation(object):
+    def __init__(self, rng):
+        self.rng = rng
+        self.now = time.time()
+        self.events = []
+        self.sequence = 0
+        self.portal = server.portal = StubPortal()
+        self.matchmaker = server.matchmaker = server.models.matchmaker.Matchmaker()
+        self.matchmaker.clock = lambda: self.now
+        self.gameplay_options = tbmatch.match_pb2.GetMatchRequest()
+        self.regions = {}
+        self.join_times = {}
+        self.debounced_poll = False
+
+        self.arrivals = 0
+        self.cancels = 0
+        self.failed_matches = 0
+        self.poll_cpu_ms = []
+        self.queue_secs = []
+        self.rating_diffs = []
+        self.ping_sums = []
+        self.cross_region = 0
+
+    def Schedule(self, delay, fn):
+        self.sequence += 1
+        heapq.heappush(self.events, (self.now + delay, self.sequence, fn))
+
+    def Run(self, seconds):
+        end = self.now + seconds
+        self.Schedule(self.rng.expovariate(options.sim_arrivals_per_sec), self.Arrive)
+        self.Schedule(server.config.match_maker_config.poll_period_ms / 1000.0, self.Tick)
+        while self.events and self.events[0][0] <= end:
+            self.now, _, fn = heapq.heappop(self.events)
+            fn()
+
+    def Arrive(self):
+        self.Schedule(self.rng.expovariate(options.sim_arrivals_per_sec), self.Arrive)
+        self.arrivals += 1
+
+        user = server.models.users.User()
+        user.rating = self.rng.gauss(1500, options.sim_rating_sd)
+        pick = self.rng.random()
+        for region, share, ping in REGIONS:
+            pick -= share
+            if pick < 0:
+                break
+        self.regions[user.user_id] = region
+
+        report = tbportal.portal_pb2.PingTestReport()
+        report.sent = report.received = server.config.portal_ping_count
+        report.avg_latency_ms = int(max(5, self.rng.gauss(ping, ping / 4.0)))
+        report.max_latency_ms = report.avg_latency_ms + self.rng.randint(0, 30)
+        server.pings.Record(user, report)
+        self.Join(user)
+
+    def Join(self, user):
+        self.join_times[user.user_id] = self.now
+        self.matchmaker.JoinQueue(user, self.gameplay_options)
+        join_time = self.now
+        self.Schedule(self.rng.expovariate(1.0 / options.sim_patience_secs), lambda: self.Cancel(user, join_time))
+        self.AfterQueueChange()
+
+    def Resume(self, user):
+        self.matchmaker.ResumeQueue(user)
+        self.AfterQueueChange()
+
+    def Cancel(self, user, join_time):
+        # only if they're still waiting from the same join.
+        if user.user_id in self.matchmaker.queue_users and self.join_times.get(user.user_id) == join_time:
+            self.cancels += 1
+            self.matchmaker.LeaveQueue(user)
+
+    def AfterQueueChange(self):
+        # the matchmaker asked for a poll on the real ioloop, which never runs here.
+        # run it at the same time on the virtual clock instead.
+        if self.matchmaker.pending_poll and not self.debounced_poll:
+            self.debounced_poll = True
+            self.Schedule(server.config.matchmaker_join_debounce_ms / 1000.0, self.DebouncedPoll)
+
+    def DebouncedPoll(self):
+        self.debounced_poll = False
+        if self.matchmaker.pending_poll:
+            self.Poll(full=False)
+
+    def Tick(self):
+        self.Schedule(server.config.match_maker_config.poll_period_ms / 1000.0, self.Tick)
+        self.Poll()
+
+    def Poll(self, full=True):
+        start = time.clock()
+        self.matchmaker.Poll(full)
+        self.poll_cpu_ms.append((time.clock() - start) * 1000)
+        self.AfterQueueChange()
+
+        for match_id, p1, p2 in self.portal.started:
+            self.Matched(match_id, p1, p2)
+        self.portal.started = []
+
+    def Matched(self, match_id, p1, p2):
+        if self.rng.random() < options.sim_handshake_fail_rate:
+            self.Schedule(HANDSHAKE_SECS, lambda: self.HandshakeFailed(match_id, p1, p2))
+            return
+        self.matchmaker.MatchConnected(match_id)
+
+        # players who resumed after a failed handshake count their wait from when they
+        # first joined.
+        for user in (p1, p2):
+            self.queue_secs.append(self.now - self.join_times.pop(user.user_id))
+        self.rating_diffs.append(abs(p1.rating - p2.rating))
+        self.ping_sums.append(server.pings.Get(p1).avg_rtt_ms + server.pings.Get(p2).avg_rtt_ms)
+        if self.regions[p1.user_id] != self.regions[p2.user_id]:
+            self.cross_region += 1
+
+        for user in (p1, p2):
+            if self.rng.random() < options.sim_replay_rate:
+                self.Schedule(self.rng.expovariate(1.0 / options.sim_game_secs), lambda user=user: self.Join(user))
+
+    def HandshakeFailed(self, match_id, p1, p2):
+        self.failed_matches += 1
+        self.matchmaker.MatchFailed(match_id)
+        for user in (p1, p2):
+            self.Schedule(RESUME_SECS, lambda user=user: self.Resume(user))
+
+def Percentiles(samples):
+    samples = sorted(samples)
+    if not samples:
+        return 'n/a'
+    values = ['p{0} {1:.1f}'.format(p, samples[min(len(samples) - 1, len(samples) * p / 100)]) for p in PERCENTILES]
+    return ', '.join(values + ['max {0:.1f}'.format(samples[-1])])
+
+def Main():
+    rng = random.Random(options.sim_seed)
+    sim = Simulation(rng)
+    config = server.config.match_queue_config
+    print '{0:g} virtual minutes, {1} arrivals/s, patience {2:.0f}s, select_size {3}, pairing {4}'.format(
+        options.sim_minutes, options.sim_arrivals_per_sec, options.sim_patience_secs, config.select_size, server.config.matchmaker_pairing)
+
+    start = time.time()
+    sim.Run(options.sim_minutes * 60)
+    elapsed = time.time() - start
+
+    matches = len(sim.rating_diffs)
+    print 'ran in {0:.1f}s'.format(elapsed)
+    print 'arrivals {0}, matches {1} ({2:.1f}/min), canceled {3}, failed handshakes {4}, still queued {5}'.format(
+        sim.arrivals, matches, matches / options.sim_minutes, sim.cancels, sim.failed_matches, len(sim.matchmaker.queue_users))
+    print 'polls {0}, cpu ms per poll: {1}'.format(len(sim.poll_cpu_ms), Percentiles(sim.poll_cpu_ms))
+    print 'queue secs: {0}'.format(Percentiles(sim.queue_secs))
+    print 'rating diff: {0}'.format(Percentiles(sim.rating_diffs))
+    print 'ping sum ms: {0}'.format(Percentiles(sim.ping_sums))
+    print 'cross region: {0:.1f}%'.format(100.0 * sim.cross_region / max(matches, 1))
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,56 @@
+"""
+bench_rating_period.py
+
+Measure a Glicko-2 rating period for 100k rated players, half of whom played
+a few matches during the period.  Compares the plain Python update in
+server.models.ratings against the NumPy version and checks they agree.
+
+Usage: python benchmarks/bench_rating_period.py
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.models.ratings
+
+PLAYERS = 100000
+MATCHES = 100000
+
+def Main():
+    if not server.models.ratings.numpy:
+        print 'NumPy is not installed.'
+        return
+
+    rng = random.Random(1)
+    ratings = [rng.gauss(1500, 300) for _ in xrange(PLAYERS)]
+    deviations = [rng.uniform(30, 350) for _ in xrange(PLAYERS)]
+    volatilities = [server.models.ratings.DEFAULT_VOLATILITY] * PLAYERS
+    results = []
+    for _ in xrange(MATCHES):
+        p1 = rng.randrange(PLAYERS / 2)
+        p2 = rng.randrange(PLAYERS / 2)
+        if p1 != p2:
+            score = rng.choice((0.0, 0.5, 1.0))
+            results.append((p1, p2, score))
+            results.append((p2, p1, 1.0 - score))
+
+    timings = []
+    for name, update in (('python', server.models.ratings.UpdateRatingsPython), ('numpy', server.models.ratings.UpdateRatingsNumpy)):
+        start = time.time()
+        updated = update(ratings, deviations, volatilities, results)
+        timings.append((name, time.time() - start, updated))
+
+    (_, _, expected), (_, _, actual) = timings
+    for e, a in zip(expected, actual):
+        assert max(abs(x - y) for x, y in zip(e, a)) < 1e-6
+
+    print '{0} players, {1} matches'.format(PLAYERS, len(results) / 2)
+    for name, elapsed, _ in timings:
+        print '{0:<8} {1:>8.1f} ms/period'.format(name, elapsed * 1000)
+
+if __name__ == '__main__':
+    Main()
@@ -0,0 +1,78 @@
+"""
+bench_rpc_logging.py
+
+Measure the per-RPC cost of tracing requests and responses, comparing the old
+always-format-to-JSON LogProto against the level-gated, sampled tracing in
+server/rpc.py.
+
+Usage: python benchmarks/bench_rpc_logging.py
+"""
+
+import os
+import sys
+import timeit
+import logging
+
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')))
+import server
+import server.rpc
+import server.config
+import google.protobuf.json_format
+import tbmatch.match_pb2
+import tbmatch.session_pb2
+
+ITERATIONS = 20000
+
+def LogProtoUngated(reason, proto):
+    # LogProto as it was before tracing was gated on the log level.
+    json = google.protobuf.json_format.MessageToJson(proto)
+    for line in json.split('\n'):
+        logging.debug(reason + line)
+        reason = ''
+
+def MakeMessages():
+    request = tbmatch.session_pb2.LoginRequest()
+    request.login = 'testuser001'
+    request.build_version = '1728'
+
+    response = tbmatch.match_pb2.GameProfile()
+    response.account_id = 1234
+    response.handle = 'User 001'
+    response.given_name = 'Ana Itza'
+    response.locale = 'en-US'
+    return request, response
+
+def Before(request, response):
+    LogProtoUngated('received Login ', request)
+    LogProtoUngated('replying with ', response)
+
+def After(request, response):
+    if server.rpc.ShouldTraceRpc('Login'):
+        server.rpc.LogProto('received Login ', request)
+        server.rpc.LogProto('replying with ', response)
+
+def Run(name, fn, level, sample_rate=1, allowlist=None):
+    logging.getLogger().setLevel(level)
+    server.config.rpc_trace_sample_rate = sample_rate
+    server.config.rpc_trace_allowlist = allowlist or []
+
+    request, response = MakeMessages()
+    elapsed = timeit.timeit(lambda: fn(request, response), number=ITERATIONS)
+    print '{0:<40} {1:>8.2f} us/rpc'.format(name, elapsed * 1e6 / ITERATIONS)
+
+def Main():
+    # throw away the output.  we're measuring the cost of formatting, not of the handler.
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.NullHandler())
+
+    Run('before, level INFO', Before, logging.INFO)
+    Run('after,  level INFO', After, logging.INFO)
+    Run('before, level DEBUG', Before, logging.DEBUG)
+    Run('after,  level DEBUG', After, logging.DEBUG)
+    Run('after,  level DEBUG, 1 in 100', After, logging.DEBUG, sample_rate=100)
+    Run('after,  level DEBUG, not allowlisted', After, logging.DEBUG, allowlist=['GetMatch'])
+
+if __name__ == '__main__':
+    Main()
@@ -14,7 +14,7 @@ import mako.runtime
 
 def CreateRoutes(templateFile):
     """
-    Create flask routes for each RPC endpoint for all services.
+    Create routes for each RPC endpoint for all services.
     """
 
     # The name of a type in the .proto doesn't exactly match the name of
@@ -30,8 +30,10 @@ def CreateRoutes(templateFile):
     # can mass import them at the top of the routes.py file.
     imports = []
 
-    for root, _, files in os.walk('.'):
-        for f in files:
+    # walk in sorted order so the generated files don't churn between machines
+    for root, dirs, files in os.walk('.'):
+        dirs.sort()
+        for f in sorted(files):
             if f.endswith('_pb2.py'):
                 filename = os.path.join(root, f[:-3]) # make sure we pull off the .py at the end
                 parts = os.path.normpath(filename).split(os.sep)
@@ -70,6 +72,7 @@ def CreateRoutes(templateFile):
 
                         services.append({
                             'name' : obj.full_name,
+                            'module' : modulename,
                             'methods' : methods,
                         })
 
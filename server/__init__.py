@@ -3,11 +3,14 @@ import tornado.log
 import tornado.options
 import tornado.web
 import tornado.ioloop
+import server.stats
 import server.generated_routes
 import server.models.portal
 import server.models.matchmaker
 import server.models.users
 import server.models.lobbies
+import server.models.ratings
+import server.models.pings
 
 tornado.options.parse_command_line()
 tornado.log.enable_pretty_logging()
@@ -19,6 +22,8 @@ users = server.models.users.Users()
 matchmaker = server.models.matchmaker.Matchmaker()
 portal = server.models.portal.Portal()
 lobbies = server.models.lobbies.Lobbies()
+ratings = server.models.ratings.Ratings()
+pings = server.models.pings.PingTable()
 
 import server.services.match_service
 import server.services.lobby_service
@@ -29,9 +34,13 @@ def Start():
     tornado.log.logging.info("Server starting at {0}".format(server.config.hostname))
 
     matchmaker.StartPolling()
+    ratings.StartRatingPeriods()
+    lobbies.StartReaping()
 
     routes = server.generated_routes.GetRoutes()
-    routes.append((r'/_01/rpc/GetEvent', server.services.event_service.GetEventHandler))
+    routes.append((r'/_01/stats', server.stats.StatsHandler))
+    if server.config.event_socket_enabled:
+        routes.append((r'/_01/events', server.services.event_service.EventSocketHandler))
     app.add_handlers(r'.*', routes) 
     app.listen(server.config.port)
     ioloop.start()
@@ -3,6 +3,7 @@ config.py
 """
 
 import os
+import tbadmin.config_pb2
 import tbmatch.match_pb2
 import tbportal.portal_pb2
 
@@ -21,6 +22,67 @@ portal_port_range = 4096
 # number of times to ping for the ping test
 portal_ping_count = 5
 
+# RPC tracing.  Requests and responses are only formatted when logging at DEBUG.
+# Log 1 in rpc_trace_sample_rate calls of each RPC, and if rpc_trace_allowlist
+# isn't empty, only trace the RPCs named in it (e.g. ['GetMatch', 'GetEvent']).
+rpc_trace_sample_rate = 1
+rpc_trace_allowlist = []
+
+# GetEvent requests with nothing to deliver are held open for at most
+# change_wait_timeout_ms, then answered with no events.
+event_config = tbadmin.config_pb2.EventConfig()
+
+# Most events to hold for a user who hasn't acknowledged them.  Once full, the oldest
+# events are dropped and the client is told to resync.
+event_queue_capacity = 256
+
+# Let clients open a websocket at /_01/events and have events pushed to them
+# instead of polling GetEvent.
+event_socket_enabled = True
+
+# The matchmaker runs every match_maker_config.poll_period_ms, and shortly after
+# someone joins the queue.  Joins within matchmaker_join_debounce_ms of each other
+# share one pass.
+match_maker_config = tbadmin.config_pb2.MatchMakerConfig()
+matchmaker_join_debounce_ms = 20
+
+# How the matchmaker picks opponents: select_size, queue_ticket_ttl, the
+# last_opp_*, rating_* and ping_score_* settings.  The rest of MatchQueueConfig
+# is ignored, e.g. geo_* and cross_continent_exclude_time since nothing here knows
+# where players are, and echelon_* and point_* since ranks aren't tracked.
+match_queue_config = tbadmin.config_pb2.MatchQueueConfig()
+
+# The most tickets the matchmaker will look at for opponents in one pass, across
+# everyone waiting.  Caps how long a full pass can hold up the ioloop when the queue
+# is big; anyone it doesn't get to is looked at in another pass straight after.
+matchmaker_candidates_per_pass = 5000
+
+# How the matchmaker pairs up the oldest tickets each pass.  'greedy' takes the best
+# scoring pairs first.  'optimal' finds the best pairing overall of the oldest
+# matchmaker_optimal_pool_max tickets, falling back to greedy if that takes longer
+# than matchmaker_optimal_budget_ms.
+matchmaker_pairing = 'greedy'
+matchmaker_optimal_pool_max = 32
+matchmaker_optimal_budget_ms = 10
+
+# How long to keep ping test results around for.
+match_user_config = tbadmin.config_pb2.MatchUserConfig()
+
+# Ratings and other settings shared by the match services.
+match_service_config = tbadmin.config_pb2.MatchServiceConfig()
+
+# Join code length and lobby size.
+lobby_service_config = tbadmin.config_pb2.LobbyServiceConfig()
+
+# Lobby size and lifetimes.  A lobby takes at most the smaller of the two
+# max_members.  Lobbies nobody has done anything in for lobby_ttl seconds are
+# closed, and a lobby match whose game session never reports back is forgotten
+# after active_match_timeout seconds.  Lobbies are checked on every
+# lobby_reap_period_ms, at most lobby_reap_batch of them at a time.
+lobby_config = tbadmin.config_pb2.LobbyConfig()
+lobby_reap_period_ms = 1000
+lobby_reap_batch = 256
+
 # amount of time to wait on the client to allow for UI setup before redeeming the game session ticket
 game_session_ticket_wait_interval_ms = 0.25
 
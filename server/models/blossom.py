@@ -0,0 +1,403 @@
+"""
+blossom.py
+
+Maximum weight matching on a general graph, with Edmonds' blossom algorithm.
+
+MaxWeightMatching finds the matching with the most edges and, among those, the
+highest total weight, in O(n^3).  It keeps a dual variable for every vertex and
+every blossom (an odd cycle shrunk to a single vertex), and each stage grows
+alternating trees from the unmatched vertices along edges with zero slack until
+it finds an augmenting path, adjusting the duals whenever it gets stuck.  This
+follows Galil, "Efficient algorithms for finding maximum matching in graphs"
+(ACM Computing Surveys, 1986).
+
+Weights should be integers, so the duals stay exact.
+
+Vertices are numbered 0 to n - 1.  Edge k has endpoints 2k and 2k + 1, and an
+endpoint p is the end of its edge at vertex endpoint[p]; p ^ 1 is the other end.
+Blossoms are numbered n to 2n - 1.  Labels are 0 for free, 1 for S (an even
+distance from the root of its tree) and 2 for T (odd).
+"""
+
+import time
+
+def MaxWeightMatching(n, edges, deadline=None):
+    """
+    Return mate, where mate[v] is the vertex v is matched with or -1, given edges
+    as a list of (i, j, weight).  Returns None if time.time() passes deadline
+    first.
+    """
+    if not edges:
+        return [-1] * n
+
+    max_weight = max(0, max(weight for _, _, weight in edges))
+    endpoint = [edges[p // 2][p % 2] for p in xrange(2 * len(edges))]
+    neighbend = [[] for _ in xrange(n)]
+    for k, (i, j, _) in enumerate(edges):
+        neighbend[i].append(2 * k + 1)
+        neighbend[j].append(2 * k)
+
+    # mate[v] is the remote endpoint of v's matched edge, until the very end.
+    mate = [-1] * n
+    label = [0] * (2 * n)
+    # the endpoint through which a vertex or top level blossom got its label.
+    labelend = [-1] * (2 * n)
+    # the top level blossom each vertex is in.
+    inblossom = range(n)
+    blossomparent = [-1] * (2 * n)
+    # sub-blossoms of each blossom, starting from the base and going around.
+    blossomchilds = [None] * (2 * n)
+    blossombase = range(n) + [-1] * n
+    # blossomendps[b][i] joins blossomchilds[b][i] to blossomchilds[b][i + 1].
+    blossomendps = [None] * (2 * n)
+    # least slack edge to a different S blossom, for each free vertex or S blossom.
+    bestedge = [-1] * (2 * n)
+    blossombestedges = [None] * (2 * n)
+    unusedblossoms = range(n, 2 * n)
+    dualvar = [max_weight] * n + [0] * n
+    allowedge = [False] * len(edges)
+    queue = []
+
+    def Slack(k):
+        i, j, weight = edges[k]
+        return dualvar[i] + dualvar[j] - 2 * weight
+
+    def Leaves(b):
+        # every vertex inside b.
+        if b < n:
+            return [b]
+        leaves = []
+        stack = [b]
+        while stack:
+            t = stack.pop()
+            if t < n:
+                leaves.append(t)
+            else:
+                stack.extend(blossomchilds[t])
+        return leaves
+
+    def AssignLabel(w, t, p):
+        # label w's blossom t, reached through endpoint p.  a T blossom's mate
+        # becomes S.
+        b = inblossom[w]
+        label[w] = label[b] = t
+        labelend[w] = labelend[b] = p
+        bestedge[w] = bestedge[b] = -1
+        if t == 1:
+            queue.extend(Leaves(b))
+        else:
+            base = blossombase[b]
+            AssignLabel(endpoint[mate[base]], 1, mate[base] ^ 1)
+
+    def ScanBlossom(v, w):
+        # trace back from S vertices v and w towards their roots.  returns the base
+        # of the new blossom if the paths meet, or -1 for an augmenting path.
+        path = []
+        base = -1
+        while v != -1 or w != -1:
+            b = inblossom[v]
+            if label[b] & 4:
+                base = blossombase[b]
+                break
+            path.append(b)
+            label[b] = 5
+            if labelend[b] == -1:
+                # reached a root.
+                v = -1
+            else:
+                v = endpoint[labelend[b]]
+                b = inblossom[v]
+                v = endpoint[labelend[b]]
+            if w != -1:
+                v, w = w, v
+        for b in path:
+            label[b] = 1
+        return base
+
+    def AddBlossom(base, k):
+        # shrink the cycle through edge k and base into a new S blossom.
+        v, w, _ = edges[k]
+        bb = inblossom[base]
+        bv = inblossom[v]
+        bw = inblossom[w]
+        b = unusedblossoms.pop()
+        blossombase[b] = base
+        blossomparent[b] = -1
+        blossomparent[bb] = b
+        blossomchilds[b] = path = []
+        blossomendps[b] = endps = []
+        while bv != bb:
+            blossomparent[bv] = b
+            path.append(bv)
+            endps.append(labelend[bv])
+            v = endpoint[labelend[bv]]
+            bv = inblossom[v]
+        path.append(bb)
+        path.reverse()
+        endps.reverse()
+        endps.append(2 * k)
+        while bw != bb:
+            blossomparent[bw] = b
+            path.append(bw)
+            endps.append(labelend[bw] ^ 1)
+            w = endpoint[labelend[bw]]
+            bw = inblossom[w]
+        label[b] = 1
+        labelend[b] = labelend[bb]
+        dualvar[b] = 0
+        for v in Leaves(b):
+            if label[inblossom[v]] == 2:
+                # T vertices inside become S, so they need scanning.
+                queue.append(v)
+            inblossom[v] = b
+
+        bestedgeto = [-1] * (2 * n)
+        for bv in path:
+            if blossombestedges[bv] is None:
+                nblists = [[p // 2 for p in neighbend[v]] for v in Leaves(bv)]
+            else:
+                nblists = [blossombestedges[bv]]
+            for nblist in nblists:
+                for k in nblist:
+                    i, j, _ = edges[k]
+                    if inblossom[j] == b:
+                        i, j = j, i
+                    bj = inblossom[j]
+                    if bj != b and label[bj] == 1 and (bestedgeto[bj] == -1 or Slack(k) < Slack(bestedgeto[bj])):
+                        bestedgeto[bj] = k
+            blossombestedges[bv] = None
+            bestedge[bv] = -1
+        blossombestedges[b] = [k for k in bestedgeto if k != -1]
+        bestedge[b] = -1
+        for k in blossombestedges[b]:
+            if bestedge[b] == -1 or Slack(k) < Slack(bestedge[b]):
+                bestedge[b] = k
+
+    def ExpandBlossom(b, endstage):
+        # turn b's sub-blossoms back into top level blossoms.
+        for s in blossomchilds[b]:
+            blossomparent[s] = -1
+            if s < n:
+                inblossom[s] = s
+            elif endstage and dualvar[s] == 0:
+                ExpandBlossom(s, endstage)
+            else:
+                for v in Leaves(s):
+                    inblossom[v] = s
+
+        if not endstage and label[b] == 2:
+            # b's dual went to zero mid stage.  relabel the sub-blossoms on the even
+            # length path from where b was entered to its base.
+            entrychild = inblossom[endpoint[labelend[b] ^ 1]]
+            j = blossomchilds[b].index(entrychild)
+            if j & 1:
+                j -= len(blossomchilds[b])
+                jstep = 1
+                endptrick = 0
+            else:
+                jstep = -1
+                endptrick = 1
+            p = labelend[b]
+            while j != 0:
+                label[endpoint[p ^ 1]] = 0
+                label[endpoint[blossomendps[b][j - endptrick] ^ endptrick ^ 1]] = 0
+                AssignLabel(endpoint[p ^ 1], 2, p)
+                allowedge[blossomendps[b][j - endptrick] // 2] = True
+                j += jstep
+                p = blossomendps[b][j - endptrick] ^ endptrick
+                allowedge[p // 2] = True
+                j += jstep
+            # the base becomes T without passing the label on to its mate.
+            bv = blossomchilds[b][j]
+            label[endpoint[p ^ 1]] = label[bv] = 2
+            labelend[endpoint[p ^ 1]] = labelend[bv] = p
+            bestedge[bv] = -1
+            # the rest of the way round, label anything reachable from outside.
+            j += jstep
+            while blossomchilds[b][j] != entrychild:
+                bv = blossomchilds[b][j]
+                if label[bv] == 1:
+                    j += jstep
+                    continue
+                for v in Leaves(bv):
+                    if label[v] != 0:
+                        break
+                if label[v] != 0:
+                    label[v] = 0
+                    label[endpoint[mate[blossombase[bv]]]] = 0
+                    AssignLabel(v, 2, labelend[v])
+                j += jstep
+
+        label[b] = labelend[b] = -1
+        blossomchilds[b] = blossomendps[b] = None
+        blossombase[b] = -1
+        blossombestedges[b] = None
+        bestedge[b] = -1
+        unusedblossoms.append(b)
+
+    def AugmentBlossom(b, v):
+        # swap matched and unmatched edges around b from vertex v to the base, and
+        # make v the new base.
+        t = v
+        while blossomparent[t] != b:
+            t = blossomparent[t]
+        if t >= n:
+            AugmentBlossom(t, v)
+        i = j = blossomchilds[b].index(t)
+        if i & 1:
+            j -= len(blossomchilds[b])
+            jstep = 1
+            endptrick = 0
+        else:
+            jstep = -1
+            endptrick = 1
+        while j != 0:
+            j += jstep
+            t = blossomchilds[b][j]
+            p = blossomendps[b][j - endptrick] ^ endptrick
+            if t >= n:
+                AugmentBlossom(t, endpoint[p])
+            j += jstep
+            t = blossomchilds[b][j]
+            if t >= n:
+                AugmentBlossom(t, endpoint[p ^ 1])
+            mate[endpoint[p]] = p ^ 1
+            mate[endpoint[p ^ 1]] = p
+        blossomchilds[b] = blossomchilds[b][i:] + blossomchilds[b][:i]
+        blossomendps[b] = blossomendps[b][i:] + blossomendps[b][:i]
+        blossombase[b] = blossombase[blossomchilds[b][0]]
+
+    def AugmentMatching(k):
+        # flip every edge on the augmenting path through edge k.
+        v, w, _ = edges[k]
+        for s, p in ((v, 2 * k + 1), (w, 2 * k)):
+            while True:
+                bs = inblossom[s]
+                if bs >= n:
+                    AugmentBlossom(bs, s)
+                mate[s] = p
+                if labelend[bs] == -1:
+                    # reached a root.
+                    break
+                t = endpoint[labelend[bs]]
+                bt = inblossom[t]
+                s = endpoint[labelend[bt]]
+                j = endpoint[labelend[bt] ^ 1]
+                if bt >= n:
+                    AugmentBlossom(bt, j)
+                mate[j] = labelend[bt]
+                p = labelend[bt] ^ 1
+
+    for _ in xrange(n):
+        # each stage augments the matching by one edge, or finds it can't.
+        if deadline is not None and time.time() > deadline:
+            return None
+        label[:] = [0] * (2 * n)
+        bestedge[:] = [-1] * (2 * n)
+        blossombestedges[n:] = [None] * n
+        allowedge[:] = [False] * len(edges)
+        queue[:] = []
+        for v in xrange(n):
+            if mate[v] == -1 and label[inblossom[v]] == 0:
+                AssignLabel(v, 1, -1)
+
+        augmented = False
+        while True:
+            while queue and not augmented:
+                v = queue.pop()
+                for p in neighbend[v]:
+                    k = p // 2
+                    w = endpoint[p]
+                    if inblossom[v] == inblossom[w]:
+                        continue
+                    if not allowedge[k]:
+                        kslack = Slack(k)
+                        if kslack <= 0:
+                            allowedge[k] = True
+                    if allowedge[k]:
+                        if label[inblossom[w]] == 0:
+                            AssignLabel(w, 2, p ^ 1)
+                        elif label[inblossom[w]] == 1:
+                            base = ScanBlossom(v, w)
+                            if base >= 0:
+                                AddBlossom(base, k)
+                            else:
+                                AugmentMatching(k)
+                                augmented = True
+                                break
+                        elif label[w] == 0:
+                            # w is inside a T blossom, reached here first.
+                            label[w] = 2
+                            labelend[w] = p ^ 1
+                    elif label[inblossom[w]] == 1:
+                        b = inblossom[v]
+                        if bestedge[b] == -1 or kslack < Slack(bestedge[b]):
+                            bestedge[b] = k
+                    elif label[w] == 0:
+                        if bestedge[w] == -1 or kslack < Slack(bestedge[w]):
+                            bestedge[w] = k
+            if augmented:
+                break
+
+            # stuck.  find the smallest change to the duals which lets us go on:
+            # 2 is an edge from S to a free vertex going tight, 3 an edge between two
+            # S blossoms, 4 a T blossom's dual reaching zero.  with nothing left,
+            # the matching has as many edges as it can.
+            deltatype = -1
+            delta = deltaedge = deltablossom = None
+            for v in xrange(n):
+                if label[inblossom[v]] == 0 and bestedge[v] != -1:
+                    d = Slack(bestedge[v])
+                    if deltatype == -1 or d < delta:
+                        delta, deltatype, deltaedge = d, 2, bestedge[v]
+            for b in xrange(2 * n):
+                if blossomparent[b] == -1 and label[b] == 1 and bestedge[b] != -1:
+                    d = Slack(bestedge[b]) // 2
+                    if deltatype == -1 or d < delta:
+                        delta, deltatype, deltaedge = d, 3, bestedge[b]
+            for b in xrange(n, 2 * n):
+                if blossombase[b] >= 0 and blossomparent[b] == -1 and label[b] == 2 and (deltatype == -1 or dualvar[b] < delta):
+                    delta, deltatype, deltablossom = dualvar[b], 4, b
+            if deltatype == -1:
+                deltatype = 1
+                delta = max(0, min(dualvar[:n]))
+
+            for v in xrange(n):
+                if label[inblossom[v]] == 1:
+                    dualvar[v] -= delta
+                elif label[inblossom[v]] == 2:
+                    dualvar[v] += delta
+            for b in xrange(n, 2 * n):
+                if blossombase[b] >= 0 and blossomparent[b] == -1:
+                    if label[b] == 1:
+                        dualvar[b] += delta
+                    elif label[b] == 2:
+                        dualvar[b] -= delta
+
+            if deltatype == 1:
+                break
+            elif deltatype == 2:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                if label[inblossom[i]] == 0:
+                    i, j = j, i
+                queue.append(i)
+            elif deltatype == 3:
+                allowedge[deltaedge] = True
+                i, j, _ = edges[deltaedge]
+                queue.append(i)
+            else:
+                ExpandBlossom(deltablossom, False)
+
+        if not augmented:
+            break
+
+        # S blossoms whose dual reached zero don't need to stay shrunk.
+        for b in xrange(n, 2 * n):
+            if blossomparent[b] == -1 and blossombase[b] >= 0 and label[b] == 1 and dualvar[b] == 0:
+                ExpandBlossom(b, True)
+
+    for v in xrange(n):
+        if mate[v] >= 0:
+            mate[v] = endpoint[mate[v]]
+    return mate
@@ -0,0 +1,208 @@
+"""
+events.py
+
+Per-user queue of events waiting to be delivered by GetEvent.
+
+Events are kept in their serialized form.  An event sent to a whole lobby is
+serialized once, without an event_id, and every recipient's queue shares those
+bytes.  Protobuf doesn't care what order fields show up on the wire, so each
+queue just puts its own event_id in front of the shared body.  GetEventResult
+replies are put together the same way, straight from the bytes, and the result
+is cached until the queue changes so clients polling again before acknowledging
+don't cost us anything.
+
+Events go out either as GetEvent replies or, for clients connected to the
+websocket at /_01/events, as GetEventResult frames pushed as soon as they're
+sent.  Both share the same queue.
+"""
+
+import datetime
+import collections
+import tornado.concurrent
+import server
+import server.stats
+import tbmatch.event_pb2
+
+# Wire types.
+WIRE_VARINT = 0
+WIRE_LENGTH_DELIMITED = 2
+
+# Wire tags (field number << 3 | wire type) for the fields we write by hand.
+EVENT_ID_TAG = chr(1 << 3 | 0)          # Event.event_id, varint
+EVENT_TYPE_TAG = chr(2 << 3 | 0)        # Event.type, varint
+RESULT_VERSION_TAG = chr(1 << 3 | 2)    # GetEventResult.version, length delimited
+RESULT_EVENT_TAG = chr(2 << 3 | 2)      # GetEventResult.event, length delimited
+
+def EncodeVarint(value):
+    if value <= 0x7f:
+        return chr(value)
+    encoded = []
+    while value > 0x7f:
+        encoded.append(chr(0x80 | (value & 0x7f)))
+        value >>= 7
+    encoded.append(chr(value))
+    return ''.join(encoded)
+
+def EncodeLengthDelimited(tag, value):
+    return tag + EncodeVarint(len(value)) + value
+
+def EncodeTag(field_number, wire_type):
+    return EncodeVarint(field_number << 3 | wire_type)
+
+class EncodedEvent(object):
+    """
+    An event serialized without its event_id, ready to be sent to any number of users.
+    """
+    def __init__(self, event_type, body):
+        self.type = event_type
+        self.body = body
+
+def EncodeEvent(event):
+    """
+    Serialize event once so it can be broadcast.  Pass the result to User.SendEvent
+    for every recipient instead of the proto.
+    """
+    if event.HasField('event_id'):
+        e = tbmatch.event_pb2.Event()
+        e.CopyFrom(event)
+        e.ClearField('event_id')
+        event = e
+    return EncodedEvent(event.type, event.SerializeToString())
+
+def EncodeEventWithPayload(event_type, field_number, payload):
+    """
+    Return the EncodedEvent of type event_type whose only other field is the message
+    field_number, given already serialized as payload.  For events built from bytes
+    we've cached, so they don't have to be parsed back into protos.
+    """
+    body = EVENT_TYPE_TAG + EncodeVarint(event_type) + EncodeLengthDelimited(EncodeTag(field_number, WIRE_LENGTH_DELIMITED), payload)
+    return EncodedEvent(event_type, body)
+
+def EncodeEventForUser(event_id, encoded):
+    """
+    Return the serialized tbmatch.Event for encoded with event_id spliced in.
+    """
+    return EVENT_ID_TAG + EncodeVarint(event_id) + encoded.body
+
+def EncodeResultEvent(event_id, encoded):
+    """
+    Return encoded with event_id spliced in, framed as a GetEventResult.event field.
+    """
+    return EncodeLengthDelimited(RESULT_EVENT_TAG, EncodeEventForUser(event_id, encoded))
+
+_PARKED_POLLS = set()
+server.stats.SetGauge('events.parked_polls', lambda: len(_PARKED_POLLS))
+
+class LongPoll(object):
+    """
+    A GetEvent request parked until there are events to send.  future resolves to the
+    serialized GetEventResult passed to Finish, or to None (an empty reply) if nothing
+    shows up within timeout_ms or the client hangs up.  on_finished is called with the
+    poll once it's done, however that happens.
+    """
+    def __init__(self, handler, timeout_ms, on_finished):
+        self.future = tornado.concurrent.Future()
+        self.on_finished = on_finished
+        self.timeout = server.ioloop.add_timeout(datetime.timedelta(milliseconds=timeout_ms), lambda: self.OnTimeout())
+        handler.AddCloseCallback(lambda: self.OnConnectionClose())
+        _PARKED_POLLS.add(self)
+
+    def OnTimeout(self):
+        self.timeout = None
+        server.stats.Increment('events.poll_timeouts')
+        self.Finish(None)
+
+    def OnConnectionClose(self):
+        server.stats.Increment('events.poll_disconnects')
+        self.Finish(None)
+
+    def Finish(self, content):
+        if self.future.done():
+            return
+        if self.timeout:
+            server.ioloop.remove_timeout(self.timeout)
+            self.timeout = None
+        _PARKED_POLLS.discard(self)
+        self.on_finished(self)
+        self.future.set_result(content)
+
+class EventQueue(object):
+    """
+    (event_id, frame) pairs in the order they were sent, oldest first, where frame is
+    the event already encoded as a GetEventResult.event field.  Event ids only ever go
+    up, so acknowledging everything up to some id just pops from the front.
+
+    The queue holds at most capacity events.  If a client stops polling, the oldest
+    events are dropped to make room, and an E_FILTER_CHANGED event telling the client
+    its view is stale is queued behind the event which pushed them out.  It's
+    delivered and acknowledged like any other event, so a lost reply doesn't lose it.
+    resync_event_id is its id until the client acknowledges it.
+    """
+    def __init__(self, capacity):
+        self.events = collections.deque(maxlen=capacity)
+        self.resync_event_id = None
+        self.dropped = 0
+        self.encoded_events = None
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def Append(self, event_id, encoded):
+        dropped = self.Push(event_id, encoded)
+        if dropped and self.resync_event_id is None:
+            self.resync_event_id = server.GetNextUniqueId()
+            self.Push(self.resync_event_id, self.CreateResyncEvent())
+
+    def Push(self, event_id, encoded):
+        """
+        Queue encoded as event_id.  Returns True if the oldest event was dropped to make
+        room.
+        """
+        dropped = len(self.events) == self.events.maxlen
+        if dropped:
+            self.dropped += 1
+            server.stats.Increment('events.dropped')
+            if self.events[0][0] == self.resync_event_id:
+                # the resync event itself is going.  another is queued in its place.
+                self.resync_event_id = None
+        # the deque drops the oldest event for us when we append.
+        self.events.append((event_id, EncodeResultEvent(event_id, encoded)))
+        self.encoded_events = None
+        return dropped
+
+    def Acknowledge(self, last_id):
+        while self.events and last_id >= self.events[0][0]:
+            self.events.popleft()
+            self.encoded_events = None
+        if self.resync_event_id is not None and last_id >= self.resync_event_id:
+            self.resync_event_id = None
+
+    def GetLastEventId(self):
+        return self.events[-1][0]
+
+    def CreateResyncEvent(self):
+        """
+        Return the event which tells the client to resync.
+        """
+        event = tbmatch.event_pb2.Event()
+        event.type = tbmatch.event_pb2.Event.E_FILTER_CHANGED
+        event.filter_changed.SetInParent()
+        return EncodeEvent(event)
+
+    def EncodeResult(self, after_id=None):
+        """
+        Return the serialized tbmatch.GetEventResult holding every queued event, or
+        just the ones newer than after_id if given.
+        """
+        if after_id is not None:
+            encoded_events = ''.join(frame for event_id, frame in self.events if event_id > after_id)
+        else:
+            if self.encoded_events is None:
+                server.stats.Increment('events.result_cache_misses')
+                self.encoded_events = ''.join(frame for _, frame in self.events)
+            encoded_events = self.encoded_events
+
+        return EncodeLengthDelimited(RESULT_VERSION_TAG, str(self.GetLastEventId())) + encoded_events
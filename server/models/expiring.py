@@ -0,0 +1,121 @@
+"""
+expiring.py
+
+A dict whose entries go away on their own after a while, and a timer wheel for
+checking up on things every so often.
+
+Lookups are a plain dict lookup which also checks the entry's expiry time, so
+an entry is never seen after it expires even if nothing has cleaned it up yet.
+Expiry times are also kept in a heap, so Expire only ever looks at the entries
+which are actually due and never has to scan the whole map.  Setting a key again
+leaves its old heap entry behind.  Expire notices it's out of date and drops it.
+
+TimerWheel is for things which are due back at some point but are usually still
+in use when they are.  Keys are kept in one bucket per tick, so scheduling or
+rescheduling one is a dict operation, and Advance only ever looks at the buckets
+which have come due.
+"""
+
+import heapq
+
+class ExpiringMap(object):
+    def __init__(self):
+        # (expires, value) by key
+        self.entries = {}
+        # (expires, key) for every entry, soonest first.  may hold stale entries for
+        # keys which were set again or removed.
+        self.heap = []
+
+    def __len__(self):
+        return len(self.entries)
+
+    def Set(self, key, value, expires):
+        self.entries[key] = (expires, value)
+        heapq.heappush(self.heap, (expires, key))
+
+    def Get(self, key, now, default=None):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= now:
+            return default
+        return entry[1]
+
+    def Pop(self, key, now, default=None):
+        entry = self.entries.pop(key, None)
+        if entry is None or entry[0] <= now:
+            return default
+        return entry[1]
+
+    def Items(self, now):
+        return [(key, value) for key, (expires, value) in self.entries.iteritems() if expires > now]
+
+    def Expire(self, now):
+        """
+        Remove every entry which has expired by now.  Returns how many were removed.
+        """
+        heap = self.heap
+        expired = 0
+        while heap and heap[0][0] <= now:
+            expires, key = heapq.heappop(heap)
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == expires:
+                del self.entries[key]
+                expired += 1
+        if len(heap) > 2 * len(self.entries) + 64:
+            # lots of keys were set again or removed before they expired.  rebuild so
+            # the heap doesn't grow without bound.
+            self.heap = [(expires, key) for key, (expires, _) in self.entries.iteritems()]
+            heapq.heapify(self.heap)
+        return expired
+
+class TimerWheel(object):
+    def __init__(self, tick_secs, now):
+        self.tick_secs = tick_secs
+        # set of keys by the tick they're due in
+        self.buckets = {}
+        # tick each key is due in
+        self.ticks = {}
+        # first tick which hasn't been emptied yet
+        self.current = self.GetTick(now)
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def GetTick(self, when):
+        return int(when / self.tick_secs)
+
+    def Schedule(self, key, when):
+        """
+        Have Advance hand back key once when has passed.  Replaces any earlier
+        schedule for key.
+        """
+        self.Cancel(key)
+        # never early, and anything already due goes in the bucket up next.
+        tick = max(self.GetTick(when) + 1, self.current)
+        self.buckets.setdefault(tick, set()).add(key)
+        self.ticks[key] = tick
+
+    def Cancel(self, key):
+        tick = self.ticks.pop(key, None)
+        if tick is not None:
+            bucket = self.buckets[tick]
+            bucket.discard(key)
+            if not bucket:
+                del self.buckets[tick]
+
+    def Advance(self, now, limit):
+        """
+        Return up to limit keys which are due by now, oldest tick first, and forget
+        them.  Whatever is left over comes back on the next call.
+        """
+        due = []
+        last = self.GetTick(now)
+        while self.current <= last and len(due) < limit:
+            bucket = self.buckets.get(self.current)
+            while bucket and len(due) < limit:
+                key = bucket.pop()
+                del self.ticks[key]
+                due.append(key)
+            if not bucket:
+                self.buckets.pop(self.current, None)
+                self.current += 1
+        return due
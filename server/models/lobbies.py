@@ -4,15 +4,59 @@
 lobbies.py
 
 Lobby management
+
+Lobbies keeps indexes of which lobby each user is in and which lobby each join
+code belongs to, so finding either is a dict lookup.  Lobby.AddUser and
+Lobby.RemoveUser keep the user index up to date, and Lobbies takes care of the
+join code when a lobby is created or deleted.
+
+Join codes are LobbyServiceConfig.join_code_length capital letters, and no two
+live lobbies share one.  See JoinCodeAllocator.
+
+Each lobby keeps its state serialized, as sent in E_LOBBY_JOIN, and only
+rebuilds it after something changes.  Members keep their own serialized state
+too, so a rebuild only encodes the members who changed and splices in the rest.
+E_LOBBY_UPDATE events only carry what changed, put together the same way.
+
+Lobbies take at most LobbyConfig.max_members members.  Nobody has to leave for a
+lobby to go away: every lobby sits on a timer wheel, due back when it would have
+been idle for LobbyConfig.lobby_ttl, and Lobbies.Reap works through the ones
+which have come due a batch at a time.  Members whose session has gone away
+are dropped, lobbies still in use are put back for later, and the rest are
+closed.  Lobby matches are tracked until their game
+session ends, or for LobbyConfig.active_match_timeout if it never says so.
+
+When a lobby match ends the game session reports how it went, and the lobby
+rotates its queue: the loser goes to the back and the winner stays on, or both
+go to the back after a draw or a match which never finished.  If the next two
+up are still ready, their match starts straight away.
 """
 
 import server
+import server.stats
+import server.config
+import server.models.events
+import server.models.expiring
 import string
+import time
 import random
 import logging
+import tornado.ioloop
+import tbmatch.event_pb2
 import tbmatch.match_pb2
 import tbmatch.lobby_pb2
 
+# Tags for the fields of lobby messages we put together by hand.  See events.py.
+LOBBY_MEMBER_TAG = server.models.events.EncodeTag(10, server.models.events.WIRE_LENGTH_DELIMITED)     # Lobby.member
+LOBBY_QUEUE_TAG = server.models.events.EncodeTag(30, server.models.events.WIRE_VARINT)               # Lobby.queue
+LOBBY_JOIN_LOBBY_TAG = server.models.events.EncodeTag(1, server.models.events.WIRE_LENGTH_DELIMITED) # LobbyJoinEvent.lobby
+UPDATE_LOBBY_ID_TAG = server.models.events.EncodeTag(1, server.models.events.WIRE_VARINT)            # LobbyUpdateEvent.lobby_id
+UPDATE_MEMBER_TAG = server.models.events.EncodeTag(2, server.models.events.WIRE_LENGTH_DELIMITED)    # LobbyUpdateEvent.update
+UPDATE_REMOVED_TAG = server.models.events.EncodeTag(3, server.models.events.WIRE_VARINT)             # LobbyUpdateEvent.removed
+UPDATE_QUEUE_TAG = server.models.events.EncodeTag(6, server.models.events.WIRE_VARINT)               # LobbyUpdateEvent.queue
+EVENT_LOBBY_JOIN_FIELD = 50     # Event.lobby_join
+EVENT_LOBBY_UPDATE_FIELD = 52   # Event.lobby_update
+
 class LobbyMember(object):
     def __init__(self, user, lobby):
         self.user = user
@@ -20,6 +64,8 @@ class LobbyMember(object):
         self.character = None
         self.owner = user.user_id == lobby.owner_user_id
         self.lobby = lobby
+        # serialized tbmatch.LobbyMember, or None if it needs encoding again.
+        self.encoded_state = None
 
     def EncodeState(self, state):
         state.account_id = self.user.user_id
@@ -27,53 +73,172 @@ class LobbyMember(object):
         state.owner = self.user.user_id == self.lobby.owner_user_id
         state.ready = self.ready
 
+    def GetEncodedState(self):
+        if self.encoded_state is None:
+            state = tbmatch.lobby_pb2.LobbyMember()
+            self.EncodeState(state)
+            self.encoded_state = state.SerializeToString()
+        return self.encoded_state
+
+    def Changed(self):
+        self.encoded_state = None
+        self.lobby.MarkDirty()
+
+JOIN_CODE_ALPHABET = string.ascii_uppercase
+
+# Code spaces up to this big are kept as a shuffled list of free codes.
+MAX_LISTED_JOIN_CODES = 1 << 20
+
+# How many random codes to try in a big code space before giving up.
+MAX_JOIN_CODE_ATTEMPTS = 32
+
+def NormalizeJoinCode(code):
+    return code.strip().upper()
+
+class JoinCodeAllocator(object):
+    """
+    Hands out join codes which aren't in use by a live lobby.  in_use is the code
+    index, which is what decides whether a code is taken.
+
+    Small code spaces are kept as a shuffled list of every free code, so
+    allocating is a pop no matter how many are taken, and a released code goes
+    back in at a random spot.  Bigger ones are far too big to list, but there are
+    so many codes that a random one is almost never taken, so we just draw until
+    we find a free one.
+    """
+    def __init__(self, length, in_use):
+        self.length = length
+        self.in_use = in_use
+        self.size = len(JOIN_CODE_ALPHABET) ** length
+        self.free = None
+        if self.size <= MAX_LISTED_JOIN_CODES:
+            self.free = [n for n in xrange(self.size) if self.Encode(n) not in in_use]
+            random.shuffle(self.free)
+
+    def Encode(self, n):
+        code = []
+        for _ in xrange(self.length):
+            n, digit = divmod(n, len(JOIN_CODE_ALPHABET))
+            code.append(JOIN_CODE_ALPHABET[digit])
+        return ''.join(code)
+
+    def Decode(self, code):
+        n = 0
+        for c in reversed(code):
+            n = n * len(JOIN_CODE_ALPHABET) + JOIN_CODE_ALPHABET.index(c)
+        return n
+
+    def Allocate(self):
+        if self.free is not None:
+            if not self.free:
+                raise RuntimeError('all {0} lobby join codes are in use'.format(self.size))
+            return self.Encode(self.free.pop())
+
+        for _ in xrange(MAX_JOIN_CODE_ATTEMPTS):
+            code = self.Encode(random.randrange(self.size))
+            if code not in self.in_use:
+                return code
+        raise RuntimeError('couldn\'t find a free lobby join code')
+
+    def Release(self, code):
+        """
+        code's lobby has closed, so it can be handed out again.
+        """
+        if self.free is None or len(code) != self.length:
+            return
+        self.free.append(self.Decode(code))
+        i = random.randrange(len(self.free))
+        self.free[i], self.free[-1] = self.free[-1], self.free[i]
+
 class Lobby(object):
-    def __init__(self, name):
+    def __init__(self, lobbies, name, join_code):
+        self.lobbies = lobbies
         self.name = name
         self.members = {}
         self.queue = []
         self.lobby_id = server.GetNextUniqueId()
         self.owner_user_id = None
-        self.join_code = ''.join(random.choice(string.letters).upper() for i in xrange(5))
-
-    def EncodeState(self):
+        self.join_code = join_code
+        # when anything last happened in the lobby
+        self.last_activity = lobbies.clock()
+        # (when it began, p1 user_id, p2 user_id) for each match the lobby started,
+        # by match_id, until it ends
+        self.active_matches = {}
+        # serialized tbmatch.Lobby, good until dirty is set.
+        self.dirty = True
+        self.encoded_state = None
+        self.encoded_header = self.EncodeHeader().SerializeToString()
+
+    def MarkDirty(self):
+        self.dirty = True
+        self.last_activity = self.lobbies.clock()
+
+    def EncodeHeader(self):
         state = tbmatch.lobby_pb2.Lobby()
         state.name = self.name
         state.lobby_id = self.lobby_id
         state.state = tbmatch.lobby_pb2.LS_IDLE
         state.type = tbmatch.lobby_pb2.LT_QUEUED
         state.game_config.options.mode = tbmatch.match_pb2.GameOptions.GM_FIGHT
-
-        for m in self.members.values():
-            member = state.member.add()
-            member.account_id = m.user.user_id
-            member.handle = m.user.handle
-            member.owner = m.user.user_id == self.owner_user_id
-            member.ready = m.ready
-
-        for user_id in self.queue:
-            state.queue.extend([user_id])
-
         return state
 
+    def GetEncodedState(self):
+        """
+        Return the lobby's tbmatch.Lobby serialized, rebuilding it only if the lobby
+        has changed.
+        """
+        if self.dirty:
+            parts = [self.encoded_header]
+            parts.extend(server.models.events.EncodeLengthDelimited(LOBBY_MEMBER_TAG, m.GetEncodedState()) for m in self.members.itervalues())
+            parts.extend(LOBBY_QUEUE_TAG + server.models.events.EncodeVarint(user_id) for user_id in self.queue)
+            self.encoded_state = ''.join(parts)
+            self.dirty = False
+        return self.encoded_state
+
+    def SendUpdate(self, updated=(), removed=(), queue=False, skip_user=None):
+        """
+        Send everyone in the lobby but skip_user an E_LOBBY_UPDATE with the state of the
+        members in updated, the user_ids in removed and, if queue is set, the queue.
+        """
+        parts = [UPDATE_LOBBY_ID_TAG + server.models.events.EncodeVarint(self.lobby_id)]
+        parts.extend(server.models.events.EncodeLengthDelimited(UPDATE_MEMBER_TAG, m.GetEncodedState()) for m in updated)
+        parts.extend(UPDATE_REMOVED_TAG + server.models.events.EncodeVarint(user_id) for user_id in removed)
+        if queue:
+            parts.extend(UPDATE_QUEUE_TAG + server.models.events.EncodeVarint(user_id) for user_id in self.queue)
+        updateEvent = server.models.events.EncodeEventWithPayload(tbmatch.event_pb2.Event.E_LOBBY_UPDATE, EVENT_LOBBY_UPDATE_FIELD, ''.join(parts))
+
+        for m in self.members.itervalues():
+            if m.user is not skip_user:
+                m.user.SendEvent(updateEvent)
+
     def SetOwner(self, user):
+        old_owner = self.members.get(self.owner_user_id)
         self.owner_user_id = user.user_id
         member = self.members[user.user_id]
         member.owner = True
+        member.Changed()
 
         #update all users in the lobby with the new owner
-        updateEvent = tbmatch.event_pb2.Event()
-        updateEvent.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
-        updateEvent.lobby_update.lobby_id = self.lobby_id
-        updateEvent.lobby_update.queue.extend(self.queue)
-        member.EncodeState(updateEvent.lobby_update.update.add())
-        
-        for m in self.members.values():
-            m.user.SendEvent(updateEvent)
+        updated = [member]
+        if old_owner and old_owner is not member:
+            old_owner.owner = False
+            old_owner.Changed()
+            updated.append(old_owner)
+        self.SendUpdate(updated)
+
+    def IsFull(self):
+        return len(self.members) >= self.lobbies.GetMaxMembers()
 
     def AddUser(self, user):
+        # you can only be in one lobby at a time
+        current = self.lobbies.FindLobbyWithUser(user)
+        if current and current is not self:
+            self.lobbies.RemoveUserFromLobby(user)
+
         member = LobbyMember(user, self)
         self.members[user.user_id] = member
+        self.lobbies.lobbies_by_user[user.user_id] = self
+        self.MarkDirty()
 
         # add them to the back of the queue, too
         self.queue.append(user.user_id)
@@ -84,66 +249,49 @@ class Lobby(object):
             self.owner_user_id = user.user_id
 
         # tell the new user to join the lobby
-        joinEvent = tbmatch.event_pb2.Event()
-        joinEvent.type = tbmatch.event_pb2.Event.E_LOBBY_JOIN
-        joinEvent.lobby_join.lobby.CopyFrom(self.EncodeState())
-        user.SendEvent(joinEvent)
+        lobby_join = server.models.events.EncodeLengthDelimited(LOBBY_JOIN_LOBBY_TAG, self.GetEncodedState())
+        user.SendEvent(server.models.events.EncodeEventWithPayload(tbmatch.event_pb2.Event.E_LOBBY_JOIN, EVENT_LOBBY_JOIN_FIELD, lobby_join))
 
         #tell existing users to update the lobby
-        updateEvent = tbmatch.event_pb2.Event()
-        updateEvent.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
-        updateEvent.lobby_update.lobby_id = self.lobby_id
-        updateEvent.lobby_update.queue.extend(self.queue)
-        member.EncodeState(updateEvent.lobby_update.update.add())
-        
-        for m in self.members.values():
-            if user.user_id != m.user.user_id:
-                m.user.SendEvent(updateEvent)
+        self.SendUpdate([member], queue=True, skip_user=user)
 
-    def RemoveUser(self, user):
+    def RemoveUser(self, user, reason=tbmatch.event_pb2.LobbyLeaveEvent.LEFT):
         # remove user from member list and from queue
         self.members.pop(user.user_id, None)
         self.queue.remove(user.user_id)
+        if self.lobbies.lobbies_by_user.get(user.user_id) is self:
+            del self.lobbies.lobbies_by_user[user.user_id]
+        self.MarkDirty()
         
         # if user who left was owner, assign new owner for lobby
         if user.user_id == self.owner_user_id and len(self.members) > 0:
                 self.SetOwner(self.members.itervalues().next().user)
 
         # tell the existing user to leave the lobby
+        self.SendLeave(user, reason)
+
+        #tell existing users to update the lobby
+        self.SendUpdate(removed=[user.user_id], queue=True, skip_user=user)
+
+    def SendLeave(self, user, reason):
         leaveEvent = tbmatch.event_pb2.Event()
         leaveEvent.type = tbmatch.event_pb2.Event.E_LOBBY_LEAVE
         leaveEvent.lobby_leave.lobby_id = self.lobby_id
-        leaveEvent.lobby_leave.reason = tbmatch.event_pb2.LobbyLeaveEvent.LEFT
+        leaveEvent.lobby_leave.reason = reason
         user.SendEvent(leaveEvent)
 
-        #tell existing users to update the lobby
-        updateEvent = tbmatch.event_pb2.Event()
-        updateEvent.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
-        updateEvent.lobby_update.lobby_id = self.lobby_id
-        updateEvent.lobby_update.queue.extend(self.queue)
-        updateEvent.lobby_update.removed.extend([user.user_id])
-        
-        for m in self.members.values():
-            if user.user_id != m.user.user_id:
-                m.user.SendEvent(updateEvent)
-
     def GetNumberOfUsers(self):
         return len(self.members)
 
     def SetUserReady(self, user, ready, character):
-        self.members[user.user_id].ready = ready
-        self.members[user.user_id].character = character
-
-        event = tbmatch.event_pb2.Event()
-        event.type = tbmatch.event_pb2.Event.E_LOBBY_UPDATE
-        event.lobby_update.lobby_id = self.lobby_id
-        self.members[user.user_id].EncodeState(event.lobby_update.update.add())
-
-        for m in self.members.values():
-            m.user.SendEvent(event)
+        member = self.members[user.user_id]
+        member.ready = ready
+        member.character = character
+        member.Changed()
+        self.SendUpdate([member])
 
     def StartMatchIfReady(self):
-        if len(self.members) < 2:
+        if len(self.members) < 2 or self.active_matches:
             return
         
         p1 = self.members[self.queue[0]]
@@ -181,34 +329,163 @@ class Lobby(object):
         event2.lobby_match_start.endpoint.CopyFrom(game_endpoint_config2)
         p2.user.SendEvent(event2)
 
+        self.lobbies.MatchStarted(self, match_id, p1.user.user_id, p2.user.user_id)
+
+    def FinishMatch(self, p1_id, p2_id, report):
+        """
+        p1_id and p2_id's match is over.  report is the match's MatchReport, or None if
+        it never finished.  Rotate the queue and line up the next match, telling
+        everyone about the new queue in one update.
+        """
+        if report and not report.draw:
+            rotate = [(p1_id, p2_id)[1 - report.win_slot]]
+        else:
+            rotate = [p1_id, p2_id]
+        rotate = [user_id for user_id in rotate if user_id in self.members]
+
+        if rotate:
+            for user_id in rotate:
+                self.queue.remove(user_id)
+            self.queue.extend(rotate)
+            self.MarkDirty()
+            self.SendUpdate(queue=True)
+        self.StartMatchIfReady()
+
 class Lobbies(object):
     def __init__(self):
         self.lobbies = {}
+        # lobby each user is in, by user_id
+        self.lobbies_by_user = {}
+        # lobbies by normalized join code
+        self.lobbies_by_code = {}
+        self.join_codes = None
+        # lobby running each lobby match, by match_id
+        self.lobbies_by_match = {}
+        self.clock = time.time
+        self.reap_wheel = server.models.expiring.TimerWheel(server.config.lobby_reap_period_ms / 1000.0, self.clock())
+        self.reap_timer = tornado.ioloop.PeriodicCallback(lambda: self.Reap(), server.config.lobby_reap_period_ms)
+        server.stats.SetGauge('lobbies.count', lambda: len(self.lobbies))
+        server.stats.SetGauge('lobbies.members', lambda: len(self.lobbies_by_user))
+        server.stats.SetGauge('lobbies.active_matches', lambda: len(self.lobbies_by_match))
+
+    def StartReaping(self):
+        self.reap_timer.start()
+
+    def GetMaxMembers(self):
+        return min(server.config.lobby_config.max_members, server.config.lobby_service_config.max_members)
 
     def CreateLobby(self, name, owner):
-        lobby = Lobby(name)
+        length = server.config.lobby_service_config.join_code_length
+        if not self.join_codes or self.join_codes.length != length:
+            self.join_codes = JoinCodeAllocator(length, self.lobbies_by_code)
+
+        lobby = Lobby(self, name, self.join_codes.Allocate())
         self.lobbies[lobby.lobby_id] = lobby
+        self.lobbies_by_code[NormalizeJoinCode(lobby.join_code)] = lobby
+        self.reap_wheel.Schedule(lobby.lobby_id, lobby.last_activity + server.config.lobby_config.lobby_ttl)
         return lobby            
 
     def GetLobby(self, lobby_id):
         return self.lobbies[lobby_id]
 
     def FindLobbyWithUser(self, user):
-        for _, lobby in self.lobbies.iteritems():
-            if user.user_id in lobby.members:
-                return lobby
-        return lobby
+        return self.lobbies_by_user.get(user.user_id)
 
     def FindLobbyWithCode(self, code):
-        for _, lobby in self.lobbies.iteritems():
-            if lobby.join_code.lower() == code.lower():
-                return lobby
+        return self.lobbies_by_code.get(NormalizeJoinCode(code))
 
     def RemoveUserFromLobby(self, user):
         lobby = self.FindLobbyWithUser(user)
-        if lobby:
-            lobby.RemoveUser(user)
+        if not lobby:
+            return
+        lobby.RemoveUser(user)
 
         # delete lobby if there are no users in it
         if lobby.GetNumberOfUsers() == 0:
-            self.lobbies.pop(lobby.lobby_id, None)
+            self.RemoveLobby(lobby)
+
+    def RemoveLobby(self, lobby):
+        self.lobbies.pop(lobby.lobby_id, None)
+        code = NormalizeJoinCode(lobby.join_code)
+        if self.lobbies_by_code.get(code) is lobby:
+            del self.lobbies_by_code[code]
+            self.join_codes.Release(code)
+        for user_id in lobby.members:
+            if self.lobbies_by_user.get(user_id) is lobby:
+                del self.lobbies_by_user[user_id]
+        for match_id in lobby.active_matches:
+            self.lobbies_by_match.pop(match_id, None)
+        self.reap_wheel.Cancel(lobby.lobby_id)
+
+    def CloseLobby(self, lobby, reason):
+        """
+        Send everyone in lobby away and delete it.
+        """
+        for m in lobby.members.itervalues():
+            lobby.SendLeave(m.user, reason)
+        self.RemoveLobby(lobby)
+
+    def MatchStarted(self, lobby, match_id, p1_id, p2_id):
+        lobby.active_matches[match_id] = (self.clock(), p1_id, p2_id)
+        self.lobbies_by_match[match_id] = lobby
+
+    def MatchEnded(self, match_id, report=None):
+        """
+        The game session for match_id is over.  report is its MatchReport if the
+        players finished and agreed on the outcome, otherwise None.  Does nothing
+        unless it was a lobby match and the lobby is still around.
+        """
+        lobby = self.lobbies_by_match.pop(match_id, None)
+        if not lobby:
+            return
+        _, p1_id, p2_id = lobby.active_matches.pop(match_id)
+        lobby.last_activity = self.clock()
+        if not lobby.active_matches:
+            self.reap_wheel.Schedule(lobby.lobby_id, lobby.last_activity + server.config.lobby_config.lobby_ttl)
+        lobby.FinishMatch(p1_id, p2_id, report)
+
+    def Reap(self):
+        """
+        Check up on the lobbies whose time is up, at most lobby_reap_batch of them.
+        """
+        now = self.clock()
+        for lobby_id in self.reap_wheel.Advance(now, server.config.lobby_reap_batch):
+            lobby = self.lobbies.get(lobby_id)
+            if lobby:
+                self.ReapLobby(lobby, now)
+
+    def ReapLobby(self, lobby, now):
+        config = server.config.lobby_config
+        for match_id, (started, _, _) in lobby.active_matches.items():
+            if now - started >= config.active_match_timeout:
+                logging.warning('lobby {0} match {1} never ended.  forgetting about it'.format(lobby.lobby_id, match_id))
+                server.stats.Increment('lobbies.leaked_matches')
+                del lobby.active_matches[match_id]
+                self.lobbies_by_match.pop(match_id, None)
+
+        for member in lobby.members.values():
+            if not server.users.HasSession(member.user):
+                logging.warning('lobby {0} member {1} has no session.  removing them'.format(lobby.lobby_id, member.user.user_id))
+                server.stats.Increment('lobbies.reaped_members')
+                lobby.RemoveUser(member.user, tbmatch.event_pb2.LobbyLeaveEvent.REMOVED)
+
+        if not lobby.members:
+            server.stats.Increment('lobbies.reaped_empty')
+            self.RemoveLobby(lobby)
+            return
+
+        # don't close a lobby in the middle of a match.  look again once the match
+        # would have leaked.
+        if lobby.active_matches:
+            started = min(started for started, _, _ in lobby.active_matches.itervalues())
+            self.reap_wheel.Schedule(lobby.lobby_id, started + config.active_match_timeout)
+            return
+
+        expires = lobby.last_activity + config.lobby_ttl
+        if now < expires:
+            self.reap_wheel.Schedule(lobby.lobby_id, expires)
+            return
+
+        logging.debug('closing lobby {0}.  idle for {1:.0f}s'.format(lobby.lobby_id, now - lobby.last_activity))
+        server.stats.Increment('lobbies.reaped_idle')
+        self.CloseLobby(lobby, tbmatch.event_pb2.LobbyLeaveEvent.REMOVED)
@@ -55,7 +55,8 @@ def CreateWaitMatchProgressEvent(
         status,
         match_id = 0, 
         game_config = None, 
-        game_endpoint_config = None):
+        game_endpoint_config = None,
+        users_waiting = 0):
     wait_match_progress = tbmatch.event_pb2.WaitMatchProgressEvent()
 
     wait_match_progress.status = status
@@ -65,6 +66,6 @@ def CreateWaitMatchProgressEvent(
         wait_match_progress.config.CopyFrom(game_config)
     if game_endpoint_config:
         wait_match_progress.endpoint.CopyFrom(game_endpoint_config)
-    wait_match_progress.users_waiting = 0
+    wait_match_progress.users_waiting = users_waiting
 
     return wait_match_progress
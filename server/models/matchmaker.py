@@ -2,84 +2,434 @@
 matchmaker.py
 
 Matchmaker model definition and registry.
+
+Everyone waiting for a match holds a QueueUser ticket.  Tickets are kept in
+the order they joined, and also in an index sorted by rating.  Each poll takes
+the oldest and newest select_size tickets from MatchQueueConfig.  The oldest
+select_size are scored against each other and the best pairs are taken (see
+matchscore.py).  Then, oldest first, whoever is left is paired with the closest
+rated ticket anywhere in the queue inside their rating window.  The window starts
+at rating_dist_min and grows by rating_dist_per_sec while the ticket waits, so
+nobody waits forever just because their rating is unusual.
+
+A poll looks at no more than matchmaker_candidates_per_pass possible opponents
+in all.  If it runs out, another poll straight after picks up where it left
+off, so a big queue doesn't hold up the ioloop for long.
+
+Users who've done a ping test are only paired if the sum of their round trip
+times to the server is under a limit which starts at ping_score_min and grows
+by ping_score_per_sec up to ping_score_max.  Users whose last ping test lost
+more than MatchServiceConfig.max_packet_loss_ratio of its packets can't join
+the queue until they do another one.
+
+If the players can't reach each other when the match starts, the portal tells
+us with MatchFailed.  Each of them gets a ticket for their old place in the
+queue, good for queue_ticket_ttl seconds, which GetMatch or ResumeGetMatch
+hands back.  Resumed tickets keep their original join time, so they're looked
+at first and their windows are as wide as they were.  The pair who failed is
+kept apart for MatchUserConfig.blacklist_ttl seconds.
+
+Everyone's last opponent is remembered for last_opp_timeout seconds, and the
+two aren't matched again until one of them has waited last_opp_exclude_time.
 """
 
+import time
+import bisect
+import datetime
+import itertools
+import collections
 import logging
 import server
 import server.config
+import server.stats
 import server.models.match
+import server.models.matchscore
+import server.models.expiring
 import tbmatch.event_pb2
 import tornado.ioloop
 
 class QueueUser(object):
-    def __init__(self, user, gameplay_options):
+    def __init__(self, user, gameplay_options, join_time=None):
         self.user = user
         self.gameplay_options = gameplay_options
+        self.join_time = join_time if join_time is not None else time.time()
+        self.rating = user.rating
+        ping_result = server.pings.Get(user)
+        self.ping = ping_result.avg_rtt_ms if ping_result else None
+        self.queued = False
+
+    def GetRatingWindow(self, now):
+        config = server.config.match_queue_config
+        return config.rating_dist_min + config.rating_dist_per_sec * (now - self.join_time)
+
+    def GetPingWindow(self, now):
+        config = server.config.match_queue_config
+        return min(config.ping_score_min + config.ping_score_per_sec * (now - self.join_time), config.ping_score_max)
 
 class Matchmaker(object):
     def __init__(self):
-        self.queue_users = []
-        self.poll_timer = tornado.ioloop.PeriodicCallback(lambda: self.Poll(), 5000)
+        # QueueUsers by user_id, oldest first.
+        self.queue_users = collections.OrderedDict()
+        # every queued QueueUser sorted by rating, with their ratings in a parallel
+        # list to bisect.  Tickets which leave the queue are only marked as gone and
+        # skipped over until enough of them pile up to be worth compacting, since
+        # deleting from the middle of a big list is slow.
+        self.ratings = []
+        self.rating_index = []
+        self.rating_index_stale = 0
+        # resumed QueueUsers by user_id.  they're older than their place at the back of
+        # queue_users says, so GetSelection puts them first.
+        self.resumed_users = {}
+        # (p1, p2) QueueUsers for matches whose players haven't connected yet, by match_id.
+        self.pending_matches = {}
+        # QueueUsers for players whose match failed, by user_id.
+        self.tickets = server.models.expiring.ExpiringMap()
+        # pairs of user_ids who couldn't connect to each other.
+        self.blacklist = server.models.expiring.ExpiringMap()
+        # the user_id of everyone's last opponent, by user_id.
+        self.last_opponents = server.models.expiring.ExpiringMap()
+        self.poll_timer = tornado.ioloop.PeriodicCallback(lambda: self.Poll(), server.config.match_maker_config.poll_period_ms)
+        self.pending_poll = None
+        # QueueUsers who joined since the last poll.
+        self.joined = []
+        self.carried = []
+        # what time the queue thinks it is.  benchmarks/bench_matchmaker_sim.py runs the
+        # matchmaker on a virtual clock instead.
+        self.clock = time.time
+        server.stats.SetGauge('matchmaker.queue_size', lambda: len(self.queue_users))
+        server.stats.SetGauge('matchmaker.last_opponents', lambda: len(self.last_opponents))
 
     def JoinQueue(self, user, gameplay_options):
-        queue_user = QueueUser(user, gameplay_options)
-        logging.debug('queue user {0} joined queue'.format(user.user_id))
-        self.queue_users.insert(0, queue_user)
+        ping_result = server.pings.Get(user)
+        if ping_result and ping_result.loss_ratio > server.config.match_service_config.max_packet_loss_ratio:
+            logging.debug('queue user {0} lost too many packets in the ping test'.format(user.user_id))
+            server.stats.Increment('matchmaker.high_packet_loss')
+            event = tbmatch.event_pb2.Event()
+            event.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
+            status = tbmatch.event_pb2.WaitMatchProgressEvent.PING_TEST_REQUIRED
+            event.wait_match_progress.CopyFrom(server.models.match.CreateWaitMatchProgressEvent(status))
+            user.SendEvent(event)
+            return
+
+        queue_user = self.queue_users.get(user.user_id)
+        if queue_user:
+            # already waiting.  keep their place in line but pick up the new options.
+            logging.debug('queue user {0} is already in the queue'.format(user.user_id))
+            queue_user.gameplay_options = gameplay_options
+        else:
+            logging.debug('queue user {0} joined queue'.format(user.user_id))
+            queue_user = QueueUser(user, gameplay_options, self.clock())
+            ticket = self.TakeTicket(user, queue_user.join_time)
+            if ticket:
+                logging.debug('queue user {0} resumed their old place in the queue'.format(user.user_id))
+                server.stats.Increment('matchmaker.resumed')
+                queue_user.join_time = ticket.join_time
+                self.resumed_users[user.user_id] = queue_user
+            self.AddQueueUser(queue_user)
+            self.joined.append(queue_user)
+            self.SchedulePoll()
 
         event = tbmatch.event_pb2.Event()
         event.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
         status = tbmatch.event_pb2.WaitMatchProgressEvent.WAITING
+        event.wait_match_progress.CopyFrom(server.models.match.CreateWaitMatchProgressEvent(status, users_waiting=len(self.queue_users)))
+        user.SendEvent(event)
+
+    def ResumeQueue(self, user):
+        """
+        Put user back in the queue with the options from their ticket.  If they don't
+        have one, tell them to ask for a match again.
+        """
+        queue_user = self.queue_users.get(user.user_id)
+        if queue_user:
+            self.JoinQueue(user, queue_user.gameplay_options)
+            return
+        ticket = self.tickets.Get(user.user_id, self.clock())
+        if ticket:
+            self.JoinQueue(user, ticket.gameplay_options)
+            return
+
+        logging.debug('queue user {0} has no ticket to resume'.format(user.user_id))
+        event = tbmatch.event_pb2.Event()
+        event.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
+        status = tbmatch.event_pb2.WaitMatchProgressEvent.TIMEOUT
         event.wait_match_progress.CopyFrom(server.models.match.CreateWaitMatchProgressEvent(status))
         user.SendEvent(event)
 
     def LeaveQueue(self, user):
         logging.debug('queue user {0} leaved queue'.format(user.user_id))
-        for u in self.queue_users:
-            if u.user.user_id == user.user_id:
-                self.queue_users.remove(u)
+        queue_user = self.queue_users.get(user.user_id)
+        if queue_user:
+            self.RemoveQueueUser(queue_user)
+
+            event = tbmatch.event_pb2.Event()
+            event.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
+            status = tbmatch.event_pb2.WaitMatchProgressEvent.CANCEL
+            event.wait_match_progress.CopyFrom(server.models.match.CreateWaitMatchProgressEvent(status))
+            user.SendEvent(event)
+
+    def AddQueueUser(self, queue_user):
+        queue_user.queued = True
+        self.queue_users[queue_user.user.user_id] = queue_user
+        i = bisect.bisect_right(self.ratings, queue_user.rating)
+        self.ratings.insert(i, queue_user.rating)
+        self.rating_index.insert(i, queue_user)
+
+    def RemoveQueueUser(self, queue_user):
+        queue_user.queued = False
+        del self.queue_users[queue_user.user.user_id]
+        self.resumed_users.pop(queue_user.user.user_id, None)
+        self.rating_index_stale += 1
+        if self.rating_index_stale * 4 > len(self.rating_index):
+            self.rating_index = [q for q in self.rating_index if q.queued]
+            self.ratings = [q.rating for q in self.rating_index]
+            self.rating_index_stale = 0
 
-                event = tbmatch.event_pb2.Event()
-                event.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
-                status = tbmatch.event_pb2.WaitMatchProgressEvent.CANCEL
-                event.wait_match_progress.CopyFrom(server.models.match.CreateWaitMatchProgressEvent(status))
-                user.SendEvent(event)
-                return
+    def TakeTicket(self, user, now):
+        """
+        Remove and return the QueueUser from user's ticket, or None if they don't have
+        one which is still good.
+        """
+        return self.tickets.Pop(user.user_id, now)
+
+    def Expire(self, now):
+        self.tickets.Expire(now)
+        self.blacklist.Expire(now)
+        self.last_opponents.Expire(now)
+
+    def MatchConnected(self, match_id):
+        self.pending_matches.pop(match_id, None)
+
+    def MatchFailed(self, match_id):
+        """
+        The players in match_id couldn't connect.  Give them both tickets back to their
+        old place in the queue and don't match them with each other again for a while.
+        """
+        players = self.pending_matches.pop(match_id, None)
+        if not players:
+            return
+        p1, p2 = players
+        logging.debug('match {0} between {1} and {2} failed'.format(match_id, p1.user.user_id, p2.user.user_id))
+        server.stats.Increment('matchmaker.failed_matches')
+
+        now = self.clock()
+        self.blacklist.Set(GetPairKey(p1.user, p2.user), True, now + server.config.match_user_config.blacklist_ttl)
+        for p in players:
+            self.tickets.Set(p.user.user_id, p, now + server.config.match_queue_config.queue_ticket_ttl)
 
     def StartPolling(self):
         logging.debug("start matchmaker polling")
         self.poll_timer.start()
 
-    def Poll(self):
-        logging.debug('running matchmaker poll (%d users)', len(self.queue_users))
+    def SchedulePoll(self):
+        """
+        Run a poll soon rather than waiting for the next tick, so someone joining the
+        queue while an opponent is already waiting gets matched right away.  That poll
+        only looks for opponents for whoever just joined, and whoever the last poll ran
+        out of time for.  Everyone else already had their chance on the last tick.
+        """
+        if self.pending_poll:
+            return
+        delay = datetime.timedelta(milliseconds=server.config.matchmaker_join_debounce_ms)
+        self.pending_poll = server.ioloop.add_timeout(delay, lambda: self.Poll(full=False))
+
+    def Poll(self, full=True):
+        if self.pending_poll:
+            server.ioloop.remove_timeout(self.pending_poll)
+            self.pending_poll = None
+
+        logging.debug('running matchmaker poll (%d users, %d joined)', len(self.queue_users), len(self.joined))
+        now = self.clock()
+        start = time.time()
+        server.stats.Increment('matchmaker.polls')
+        self.Expire(now)
+
+        joined, self.joined = self.joined, []
+        if full and not self.carried:
+            matches, self.carried = self.FindMatches(now)
+        else:
+            # whoever just joined goes first, as they would if the last pass had
+            # finished.  they weren't in the queue when it started.
+            matches, self.carried = self.FindOpponents(joined + self.carried, now)
+        for p1, p2 in matches:
+            for p in (p1, p2):
+                server.stats.Observe('matchmaker.time_to_match_ms', (now - p.join_time) * 1000)
+            server.stats.Observe('matchmaker.match_rating_diff', abs(p1.rating - p2.rating))
+            self.StartMatch(p1, p2)
+
+        server.stats.Observe('matchmaker.poll_ms', (time.time() - start) * 1000)
+
+        if self.carried:
+            # ran out of candidates to look at.  let the ioloop get on with other
+            # things, then pick up where we left off.  a tick which comes along before
+            # we're done finishes this pass rather than starting a new one, so nobody
+            # at the back of the selection gets skipped.
+            server.stats.Increment('matchmaker.carried_over')
+            self.SchedulePoll()
+
+    def GetSelection(self):
+        """
+        Return the tickets to find opponents for this pass: the oldest and newest
+        select_size in the queue, plus anyone who resumed their old place, oldest first.
+        """
+        select_size = server.config.match_queue_config.select_size
+        if len(self.queue_users) <= 2 * select_size:
+            selection = self.queue_users.values()
+        else:
+            oldest = list(itertools.islice(self.queue_users.itervalues(), select_size))
+            newest = [self.queue_users[k] for k in itertools.islice(reversed(self.queue_users), select_size)]
+            newest.reverse()
+            selection = oldest + newest
+        if self.resumed_users:
+            resumed = sorted(self.resumed_users.itervalues(), key=lambda q: q.join_time)
+            selection = resumed + [q for q in selection if q.user.user_id not in self.resumed_users]
+        return selection
+
+    def FindMatches(self, now):
+        """
+        Pair up as many of the selected tickets as we can, removing them from the
+        queue.  Returns a list of (p1, p2) pairs, and the tickets FindOpponents didn't
+        get to.
+        """
+        matches = []
+        selection = self.GetSelection()
+        pool_size = server.config.match_queue_config.select_size
+        if server.config.matchmaker_pairing == 'optimal':
+            pool_size = min(pool_size, server.config.matchmaker_optimal_pool_max)
+        pool = selection[:pool_size]
+        for p1, p2 in server.models.matchscore.PickPairs(pool, now, lambda a, b: self.IsCompatible(a, b, now)):
+            self.RemoveQueueUser(p1)
+            self.RemoveQueueUser(p2)
+            matches.append((p1, p2))
+        found, rest = self.FindOpponents(selection, now)
+        return matches + found, rest
+
+    def FindOpponents(self, seekers, now):
+        """
+        Find an opponent for each of seekers in turn with FindOpponent, removing
+        everyone matched from the queue.  Stops once matchmaker_candidates_per_pass
+        candidates have been looked at.  Returns a list of (p1, p2) pairs, and the
+        seekers it didn't get to.
+        """
+        blacklisted = collections.defaultdict(set)
+        for (a, b), _ in self.blacklist.Items(now):
+            blacklisted[a].add(b)
+            blacklisted[b].add(a)
+
+        matches = []
+        select_size = server.config.match_queue_config.select_size
+        budget = server.config.matchmaker_candidates_per_pass
+        for i, seeker in enumerate(seekers):
+            if budget < select_size and i:
+                # not enough left to give the next seeker a proper look.
+                return matches, [q for q in seekers[i:] if q.queued]
+            if not seeker.queued:
+                # already matched, or gave up waiting.
+                continue
+            opponent, looked = self.FindOpponent(seeker, now, select_size, blacklisted.get(seeker.user.user_id, ()))
+            budget -= looked
+            if opponent:
+                self.RemoveQueueUser(seeker)
+                self.RemoveQueueUser(opponent)
+                matches.append((seeker, opponent))
+        return matches, []
+
+    def FindOpponent(self, seeker, now, limit, blacklisted):
+        """
+        Walk outwards from seeker in the rating index, closest rating first, and return
+        the first ticket inside seeker's rating window which IsCompatible, along with
+        how many candidates were looked at.  Gives up after limit candidates.
+        blacklisted is the user_ids seeker can't be matched with.
+
+        This is the hot loop of a full pass, so it does the same checks as
+        IsCompatible, but works out everything which only depends on seeker up front.
+        """
+        ratings = self.ratings
+        index = self.rating_index
+        window = seeker.GetRatingWindow(now)
+        last_opponent = self.last_opponents.Get(seeker.user.user_id, now)
+        exclude_time = server.config.match_queue_config.last_opp_exclude_time
+        ping = seeker.ping
+        if ping is not None:
+            # a candidate's ping has to fit in the window of whoever has waited longer.
+            # if that's seeker, this is how much room seeker's window leaves.
+            ping_room = seeker.GetPingWindow(now) - ping
+        lo = hi = bisect.bisect_left(ratings, seeker.rating)
+        lo -= 1
+        for looked in xrange(1, limit + 1):
+            below = seeker.rating - ratings[lo] if lo >= 0 else None
+            above = ratings[hi] - seeker.rating if hi < len(ratings) else None
+            if below is not None and (above is None or below <= above):
+                distance, candidate = below, index[lo]
+                lo -= 1
+            elif above is not None:
+                distance, candidate = above, index[hi]
+                hi += 1
+            else:
+                return None, looked
+
+            if distance > window:
+                return None, looked
+            if candidate is seeker or not candidate.queued:
+                continue
+            user_id = candidate.user.user_id
+            if user_id in blacklisted:
+                continue
+            if user_id == last_opponent and now - min(seeker.join_time, candidate.join_time) < exclude_time:
+                continue
+            if ping is not None and candidate.ping is not None and candidate.ping > ping_room:
+                # only a wider window, from a candidate who's waited longer, can help.
+                if candidate.join_time >= seeker.join_time or ping + candidate.ping > candidate.GetPingWindow(now):
+                    continue
+            return candidate, looked
+        return None, limit
 
-        while len(self.queue_users) >= 2:
-            p1 = self.queue_users.pop()
-            p2 = self.queue_users.pop()
+    def IsCompatible(self, seeker, candidate, now):
+        if self.blacklist and self.blacklist.Get(GetPairKey(seeker.user, candidate.user), now):
+            return False
+        if self.last_opponents.Get(seeker.user.user_id, now) == candidate.user.user_id:
+            # they just played.  only let them play again if one of them has been
+            # waiting a while.
+            if now - min(seeker.join_time, candidate.join_time) < server.config.match_queue_config.last_opp_exclude_time:
+                return False
+        if seeker.ping is not None and candidate.ping is not None:
+            # windows only grow, so the wider one belongs to whoever has waited longer.
+            older = seeker if seeker.join_time <= candidate.join_time else candidate
+            if seeker.ping + candidate.ping > older.GetPingWindow(now):
+                return False
+        return True
 
-            # TODO put these 2 users in a temporary queue for re-queue in the case echo test failed
+    def StartMatch(self, p1, p2):
+        # found a match
+        match_id = server.GetNextUniqueId()
+        self.pending_matches[match_id] = (p1, p2)
+        expires = self.clock() + server.config.match_queue_config.last_opp_timeout
+        self.last_opponents.Set(p1.user.user_id, p2.user.user_id, expires)
+        self.last_opponents.Set(p2.user.user_id, p1.user.user_id, expires)
 
-            # found a match
-            match_id = server.GetNextUniqueId()
+        # create intermediate proto structures
+        game_config = server.models.match.CreateGameConfig(match_id, p1.user, p1.gameplay_options.character, p2.user, p2.gameplay_options.character)
 
-            # create intermediate proto structures
-            game_config = server.models.match.CreateGameConfig(match_id, p1.user, p1.gameplay_options.character, p2.user, p2.gameplay_options.character)
+        game_session = server.models.match.CreateGameSessionRequest(p1.gameplay_options.character, p2.gameplay_options.character)
+        p1port, p2port = server.portal.StartGameSession(game_session, game_config, p1.user, p2.user)
 
-            game_session = server.models.match.CreateGameSessionRequest(p1.gameplay_options.character, p2.gameplay_options.character)
-            p1port, p2port = server.portal.StartGameSession(game_session, game_config, p1.user, p2.user)
+        game_endpoint_config1 = server.models.match.CreateGameEndpointConfig(0, p1port, game_session.spec[0].secret)
+        game_endpoint_config2 = server.models.match.CreateGameEndpointConfig(1, p2port, game_session.spec[1].secret)
 
-            game_endpoint_config1 = server.models.match.CreateGameEndpointConfig(0, p1port, game_session.spec[0].secret)
-            game_endpoint_config2 = server.models.match.CreateGameEndpointConfig(1, p2port, game_session.spec[1].secret)
+        # create the final proto payload and send them as events to the matched users
+        status = tbmatch.event_pb2.WaitMatchProgressEvent.MATCH
+        users_waiting = len(self.queue_users)
+        wait_match_progress_event1 = server.models.match.CreateWaitMatchProgressEvent(status, match_id, game_config, game_endpoint_config1, users_waiting)
+        event1 = tbmatch.event_pb2.Event()
+        event1.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
+        event1.wait_match_progress.CopyFrom(wait_match_progress_event1)
+        p1.user.SendEvent(event1)
 
-            # create the final proto payload and send them as events to the matched users
-            status = tbmatch.event_pb2.WaitMatchProgressEvent.MATCH
-            wait_match_progress_event1 = server.models.match.CreateWaitMatchProgressEvent(status, match_id, game_config, game_endpoint_config1)
-            event1 = tbmatch.event_pb2.Event()
-            event1.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
-            event1.wait_match_progress.CopyFrom(wait_match_progress_event1)
-            p1.user.SendEvent(event1)
+        event2 = tbmatch.event_pb2.Event()
+        wait_match_progress_event2 = server.models.match.CreateWaitMatchProgressEvent(status, match_id, game_config, game_endpoint_config2, users_waiting)
+        event2.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
+        event2.wait_match_progress.CopyFrom(wait_match_progress_event2)
+        p2.user.SendEvent(event2)
 
-            event2 = tbmatch.event_pb2.Event()
-            wait_match_progress_event2 = server.models.match.CreateWaitMatchProgressEvent(status, match_id, game_config, game_endpoint_config2)
-            event2.type = tbmatch.event_pb2.Event.E_WAIT_MATCH_PROGRESS
-            event2.wait_match_progress.CopyFrom(wait_match_progress_event2)
-            p2.user.SendEvent(event2)
+def GetPairKey(u1, u2):
+    return (u1.user_id, u2.user_id) if u1.user_id < u2.user_id else (u2.user_id, u1.user_id)
@@ -0,0 +1,205 @@
+"""
+matchscore.py
+
+Scores every pair in a pool of queue tickets and picks the pairs to match.
+
+The score for a pair is rating_score_coeff times how far apart their ratings are,
+normalized between rating_dist_normalized_min and rating_dist_normalized_max from
+MatchQueueConfig, plus ping_score_coeff times the sum of their pings normalized
+the same way by ping_score_normalized_min and max.  Lower is better.  A pair can
+only be matched if their ratings are inside the rating window of whichever of
+them has waited longer, and, if both have done a ping test, their pings are
+inside the ping window of whichever has waited longer.
+
+By default pairs are taken greedily, best score first.  The pool is scored all at
+once with NumPy, over parallel arrays of ticket attributes.  NumPy is optional.
+Without it this stage is skipped and the matchmaker pairs everyone by walking its
+rating index.  PickPairsPython is the plain Python reference, which picks the same
+pairs as PickPairsNumpy but is far too slow to run every poll.
+
+Setting matchmaker_pairing to 'optimal' in config.py finds the best pairing
+overall instead: as many pairs as possible, then the lowest total score, with
+the maximum weight matching in blossom.py.  Only the oldest
+matchmaker_optimal_pool_max tickets go in the pool, and if the matching takes
+longer than matchmaker_optimal_budget_ms the pool is paired greedily.
+"""
+
+import time
+import server
+import server.config
+import server.stats
+import server.models.blossom
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Score of a pair which isn't allowed to be matched.
+INVALID = float('inf')
+
+# Scores are rounded to this fraction for the optimal pairing's integer weights.
+OPTIMAL_WEIGHT_SCALE = 1000000
+
+def PickPairs(pool, now, is_compatible):
+    """
+    Return a list of (older, newer) ticket pairs from pool, which must be sorted
+    oldest first.  Pairs for which is_compatible(older, newer) is False are never
+    picked.
+    """
+    if server.config.matchmaker_pairing == 'optimal':
+        if len(pool) <= server.config.matchmaker_optimal_pool_max:
+            return PickPairsOptimal(pool, now, is_compatible, server.config.matchmaker_optimal_budget_ms)
+        server.stats.Increment('matchmaker.optimal_fallbacks')
+    if numpy and len(pool) >= 2:
+        return PickPairsNumpy(pool, now, is_compatible)
+    return []
+
+def ScoreMatrixPython(pool, now):
+    """
+    Return the score of every pair in pool as a list of lists.
+    """
+    config = server.config.match_queue_config
+    lo = config.rating_dist_normalized_min
+    hi = config.rating_dist_normalized_max
+    coeff = config.rating_score_coeff
+    ping_lo = config.ping_score_normalized_min
+    ping_hi = config.ping_score_normalized_max
+    ping_coeff = config.ping_score_coeff
+
+    windows = [q.GetRatingWindow(now) for q in pool]
+    ping_windows = [q.GetPingWindow(now) for q in pool]
+    pings = [q.ping or 0.0 for q in pool]
+    scores = [[INVALID] * len(pool) for _ in pool]
+    for i in xrange(len(pool)):
+        for j in xrange(i + 1, len(pool)):
+            distance = abs(pool[i].rating - pool[j].rating)
+            if pool[i].ping is not None and pool[j].ping is not None and pings[i] + pings[j] > max(ping_windows[i], ping_windows[j]):
+                continue
+            if distance <= max(windows[i], windows[j]):
+                score = min(max((distance - lo) / (hi - lo), 0.0), 1.0) * coeff
+                score += min(max((pings[i] + pings[j] - ping_lo) / (ping_hi - ping_lo), 0.0), 1.0) * ping_coeff
+                scores[i][j] = scores[j][i] = score
+    return scores
+
+def ScoreMatrixNumpy(pool, now):
+    """
+    Same as ScoreMatrixPython, as a numpy array.
+    """
+    config = server.config.match_queue_config
+    lo = config.rating_dist_normalized_min
+    hi = config.rating_dist_normalized_max
+    coeff = config.rating_score_coeff
+    ping_lo = config.ping_score_normalized_min
+    ping_hi = config.ping_score_normalized_max
+    ping_coeff = config.ping_score_coeff
+
+    ratings = numpy.array([q.rating for q in pool], dtype=numpy.float64)
+    pings = numpy.array([q.ping or 0.0 for q in pool], dtype=numpy.float64)
+    pinged = numpy.array([q.ping is not None for q in pool])
+    join_times = numpy.array([q.join_time for q in pool], dtype=numpy.float64)
+    windows = config.rating_dist_min + config.rating_dist_per_sec * (now - join_times)
+    ping_windows = numpy.minimum(config.ping_score_min + config.ping_score_per_sec * (now - join_times), config.ping_score_max)
+
+    distance = numpy.abs(ratings[:, None] - ratings[None, :])
+    ping_sums = pings[:, None] + pings[None, :]
+    scores = numpy.clip((distance - lo) / (hi - lo), 0.0, 1.0) * coeff
+    scores += numpy.clip((ping_sums - ping_lo) / (ping_hi - ping_lo), 0.0, 1.0) * ping_coeff
+    scores[distance > numpy.maximum(windows[:, None], windows[None, :])] = INVALID
+    scores[pinged[:, None] & pinged[None, :] & (ping_sums > numpy.maximum(ping_windows[:, None], ping_windows[None, :]))] = INVALID
+    numpy.fill_diagonal(scores, INVALID)
+    return scores
+
+def PickPairsPython(pool, now, is_compatible):
+    scores = ScoreMatrixPython(pool, now)
+    return [(pool[i], pool[j]) for i, j in PickSorted(pool, scores, is_compatible)]
+
+def PickPairsNumpy(pool, now, is_compatible):
+    scores = ScoreMatrixNumpy(pool, now)
+    return [(pool[i], pool[j]) for i, j in PickMutualBest(pool, scores, is_compatible)]
+
+def PickSorted(pool, scores, is_compatible):
+    """
+    Greedily pair up pool given its score matrix as lists, by sorting every pair.
+    Returns (i, j) index pairs with i < j.
+    """
+    scored = []
+    for i in xrange(len(pool)):
+        for j in xrange(i + 1, len(pool)):
+            if scores[i][j] != INVALID:
+                scored.append((scores[i][j], i, j))
+    scored.sort()
+
+    matched = [False] * len(pool)
+    result = []
+    for _, i, j in scored:
+        if matched[i] or matched[j] or not is_compatible(pool[i], pool[j]):
+            continue
+        matched[i] = matched[j] = True
+        result.append((i, j))
+    return result
+
+def PickMutualBest(pool, scores, is_compatible):
+    """
+    Greedily pair up pool given its numpy score matrix, which is clobbered.  Returns
+    (i, j) index pairs with i < j.
+
+    Rather than sorting every pair, this repeatedly takes each ticket whose best
+    partner also likes them best.  The best remaining pair is always one of those,
+    so it picks the same pairs as PickSorted.  argmin breaks ties on the lowest
+    index, which matches the (score, i, j) order PickSorted sorts by.
+    """
+    result = []
+    rows = numpy.arange(len(pool))
+    best = scores.argmin(axis=1)
+    while True:
+        mutual = numpy.nonzero((rows < best) & (best[best] == rows) & numpy.isfinite(scores[rows, best]))[0]
+        if len(mutual) == 0:
+            return result
+
+        changed = []
+        taken = []
+        for i, j in zip(mutual.tolist(), best[mutual].tolist()):
+            if is_compatible(pool[i], pool[j]):
+                result.append((i, j))
+                taken.extend((i, j))
+            else:
+                scores[i, j] = scores[j, i] = INVALID
+            changed.extend((i, j))
+        scores[taken, :] = INVALID
+        scores[:, taken] = INVALID
+
+        # only tickets whose best partner just went away need to look again.
+        stale = numpy.nonzero(numpy.in1d(best, changed))[0]
+        stale = numpy.union1d(stale, changed)
+        best[stale] = scores[stale].argmin(axis=1)
+
+def PickPairsOptimal(pool, now, is_compatible, budget_ms):
+    """
+    Pair up pool exactly: as many pairs as possible, then the lowest total score,
+    with a maximum weight matching.  If that doesn't finish inside budget_ms, fall
+    back to the greedy pairs.
+    """
+    deadline = time.time() + budget_ms / 1000.0
+    n = len(pool)
+    if numpy and n >= 2:
+        matrix = ScoreMatrixNumpy(pool, now)
+        scores = matrix.tolist()
+    else:
+        scores = ScoreMatrixPython(pool, now)
+
+    pairs = [(i, j) for i in xrange(n) for j in xrange(i + 1, n) if scores[i][j] != INVALID and is_compatible(pool[i], pool[j])]
+    if not pairs:
+        return []
+    # the matching wants integer weights, the higher the better.  every weight is
+    # positive, and it finds the most pairs before it looks at weights, so the
+    # lowest total score wins among those.
+    ceiling = max(scores[i][j] for i, j in pairs) + 1.0
+    edges = [(i, j, int(round((ceiling - scores[i][j]) * OPTIMAL_WEIGHT_SCALE))) for i, j in pairs]
+    mate = server.models.blossom.MaxWeightMatching(n, edges, deadline)
+    if mate is None:
+        server.stats.Increment('matchmaker.optimal_budget_exhausted')
+        if numpy and n >= 2:
+            return [(pool[i], pool[j]) for i, j in PickMutualBest(pool, matrix, is_compatible)]
+        return [(pool[i], pool[j]) for i, j in PickSorted(pool, scores, is_compatible)]
+    return [(pool[i], pool[mate[i]]) for i in xrange(n) if mate[i] > i]
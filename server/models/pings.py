@@ -0,0 +1,58 @@
+"""
+pings.py
+
+Latest ping test result for each user, which the matchmaker uses to avoid
+pairing players whose connections won't make for a good game.
+
+Results expire after MatchUserConfig.ping_table_ttl seconds, in case the
+session is never cleaned up.  They're kept in the order they were recorded,
+so expired ones can be dropped from the front without looking at the rest.
+"""
+
+import time
+import collections
+import server
+import server.config
+import server.stats
+
+class PingResult(object):
+    def __init__(self, report, expires):
+        self.report = report
+        self.avg_rtt_ms = report.avg_latency_ms
+        self.max_rtt_ms = report.max_latency_ms
+        self.loss_ratio = 1.0 - float(report.received) / report.sent if report.sent else 1.0
+        self.expires = expires
+
+class PingTable(object):
+    def __init__(self):
+        # PingResults by user_id, oldest first.
+        self.results = collections.OrderedDict()
+        server.stats.SetGauge('pings.results', lambda: len(self.results))
+
+    def Record(self, user, report):
+        now = time.time()
+        self.Expire(now)
+        self.results.pop(user.user_id, None)
+        result = self.results[user.user_id] = PingResult(report, now + server.config.match_user_config.ping_table_ttl)
+        return result
+
+    def Get(self, user):
+        """
+        Return the user's PingResult, or None if they haven't done a ping test lately.
+        """
+        result = self.results.get(user.user_id)
+        if result and result.expires <= time.time():
+            del self.results[user.user_id]
+            return None
+        return result
+
+    def Remove(self, user):
+        self.results.pop(user.user_id, None)
+
+    def Expire(self, now):
+        while self.results:
+            user_id, result = next(self.results.iteritems())
+            if result.expires > now:
+                return
+            del self.results[user_id]
+            server.stats.Increment('pings.expired')
@@ -68,6 +68,7 @@ STATE_CLOSED = 'STATE_CLOSED'
 STATE_TIMED_OUT = 'STATE_TIMED_OUT'
 
 HANDSHAKE_TIMEOUT = 'HANDSHAKE_TIMEOUT'
+HANDSHAKE_FAIL = 'HANDSHAKE_FAIL'
 INACTIVE_DISCONNECT = 'INACTIVE_DISCONNECT'
 GOODBYE_DISCONNECT = 'GOODBYE_DISCONNECT'
 
@@ -165,8 +166,9 @@ class TimerStore(object):
 
     def StopAll(self):
         for name, timer in self.timers.iteritems():
-            self.logcb('stopping timer {0}'.format(name))       
-            server.ioloop.remove_timeout(timer)
+            if timer:
+                self.logcb('stopping timer {0}'.format(name))       
+                server.ioloop.remove_timeout(timer)
         self.timers = {}
 
 class GameChannel(SocketServer):
@@ -376,11 +378,13 @@ class GameChannel(SocketServer):
 class GameSession(object):
     def __init__(self, portal, game_session, game_config, p1, p2):
         self.state = STATE_INIT
+        self.portal = portal
         self.handshake_reply_count = 0
         self.variant_change_reply_count = 0
         self.finished_games = 0
         self.send_variant_change_reply_timer = None
         self.match_report = tbmatch.match_pb2.MatchReport()
+        self.match_rated = False
         self.next_game_config = None
         self.successful_match = False
         self.match_id = game_config.match_id
@@ -526,11 +530,7 @@ class GameSession(object):
 
         result = recv_channel.ValidateGoodBye(payload)        
         if result == GOODBYE_MATCH_OVER:
-            if self.AddGameToMatchRecord():
-                # at this point we trust that the clients reported things correctly
-                self.match_report.draw = self.p1.claimed_wins == self.p1.claimed_wins
-                self.match_report.win_slot = self.p1.claimed_wins > self.p1.claimed_wins and 0 or 1
-                self.match_report.players_agree = True
+            self.AddGameToMatchRecord()
             self.SendGameOver(recv_channel)
         elif result == GOODBYE_GAME_OVER:
             # One player said match over, the other said game over.
@@ -543,9 +543,10 @@ class GameSession(object):
         self.finished_games += 1
         self.Log('finished {0} games.'.format(self.finished_games))
         if self.p1.CompareClaims(self.p2) and self.finished_games == self.p1.GetClaimedFinished():
-            # now would be a good time to notify some observer or adjust elo or whatever.
             self.Log('players agree on match outcome')
             self.match_report.players_agree = True
+            if self.IsMatchOver():
+                self.RateMatch()
             return True
 
         self.Log('players disagree on match outcome. p1:{0}/{1}/{2} p2:{3}/{4}/{5}'.format(
@@ -555,6 +556,25 @@ class GameSession(object):
         self.match_report.players_agree = False
         return False
 
+    def IsMatchOver(self):
+        games_to_win = server.config.game_session_config.games_to_win
+        return self.p1.claimed_wins == games_to_win or \
+               self.p1.claimed_losses == games_to_win or \
+               self.p1.GetClaimedFinished() == games_to_win * 2 - 1
+
+    def RateMatch(self):
+        # at this point we trust that the clients reported things correctly
+        if self.match_rated:
+            return
+        self.match_rated = True
+        self.match_report.draw = self.p1.claimed_wins == self.p1.claimed_losses
+        if self.match_report.draw:
+            score = 0.5
+        else:
+            self.match_report.win_slot = 0 if self.p1.claimed_wins > self.p1.claimed_losses else 1
+            score = 1.0 if self.match_report.win_slot == 0 else 0.0
+        server.ratings.AddMatchResult(self.p1.user, self.p2.user, score)
+
     def SendGameOver(self, channel):
         gameOverEvent = tbmatch.event_pb2.Event()
         gameOverEvent.type = tbmatch.event_pb2.Event.E_GAME_OVER
@@ -588,7 +608,9 @@ class GameSession(object):
 
     def EnterState(self, state):
         start_state, self.state = self.state, state
-        if self.state == STATE_HANDSHAKE_REPORT:
+        if self.state == STATE_HANDSHAKE:
+            self.timers.Start('connect', 'connect_timeout_ms', lambda: self.NotifyTimeout(HANDSHAKE_TIMEOUT))
+        elif self.state == STATE_HANDSHAKE_REPORT:
             # Start sending handshake reply packets
             self.SendHandshakeReplyCb()
             self.p1.AwaitHandshakeReport()
@@ -598,7 +620,7 @@ class GameSession(object):
             self.p2.NewGameStarted()
             if start_state == STATE_HANDSHAKE_REPORT:
                 # send Event_Type_E_MATCH_CONNECTED to observers
-                pass
+                server.matchmaker.MatchConnected(self.match_id)
             elif start_state == STATE_GAME or start_state == STATE_GAME_PENDING:
                 # Start sending variant reply packets.
                 self.variant_change_reply_count = 0
@@ -612,9 +634,14 @@ class GameSession(object):
             # set timeout for other goodbye packet
             pass
         elif self.state == STATE_TIMED_OUT:
+            # tell the lobby which started this match, if any, how it went so it can
+            # line up the next one.  wait until the players have been told this one
+            # is over.
+            report = self.match_report if self.match_rated else None
+            server.ioloop.add_callback(lambda: server.lobbies.MatchEnded(self.match_id, report))
             if self.successful_match:
                 # wait a few seconds to catch any lingering input reports
-                self.timers.Start('linger', 'input_linger_timeout_ms', lambda: self.Close)
+                self.timers.Start('linger', 'input_linger_timeout_ms', lambda: self.Close())
             else:
                 self.Close()
         elif self.state == STATE_CLOSED:
@@ -625,7 +652,9 @@ class GameSession(object):
             # TODO: make sure this object gets destroyed or something
 
     def ExitState(self, state):
-        if state == STATE_HANDSHAKE_REPORT:
+        if state == STATE_HANDSHAKE:
+            self.timers.Stop('connect')
+        elif state == STATE_HANDSHAKE_REPORT:
             self.CancelHandshakeComplete()
         elif state == STATE_GAME:
             self.timers.Stop('goodbye')
@@ -654,10 +683,19 @@ class GameSession(object):
             self.send_handshake_reply_timer = None
         
     def NotifyTimeout(self, reason):
-        self.Log('sending abandoned event to players')
+        if self.state in [STATE_TIMED_OUT, STATE_CLOSED]:
+            return
+        self.Log('sending abandoned event to players ({0})'.format(reason))
         self.SendMatchAbandoned(self.p1)
         self.SendMatchAbandoned(self.p2)
-        pass
+
+        if reason in [HANDSHAKE_FAIL, HANDSHAKE_TIMEOUT]:
+            # the game never started, so let both players back into the queue where
+            # they were.
+            server.matchmaker.MatchFailed(self.match_id)
+
+        # either way the match is over.  shut the session down.
+        self.TransitionToState(STATE_TIMED_OUT)
 
     def SendVariantChangeReplyCb(self):
         next_config = self.next_game_config.SerializeToString()
@@ -702,12 +740,31 @@ class PingTest(SocketServer):
     def StopServing(self):
         SocketServer.StopServing(self)
 
+        report = self.CreateReport()
+        result = server.pings.Record(self.user, report)
+        self.Log('ping test done.  sent:{0} received:{1} avg:{2}ms max:{3}ms'.format(
+            report.sent, report.received, report.avg_latency_ms, report.max_latency_ms))
+
         event = tbmatch.event_pb2.Event()
         event.type = tbmatch.event_pb2.Event.E_PING_TEST_COMPLETE
         event.ping_test_complete.success = self.success
+        event.ping_test_complete.avg_rtt_ms = report.avg_latency_ms
+        event.ping_test_complete.max_rtt_ms = report.max_latency_ms
+        event.ping_test_complete.loss_ratio = result.loss_ratio
         self.user.SendEvent(event)
         server.ioloop.remove_timeout(self.timer)
 
+    def CreateReport(self):
+        report = tbportal.portal_pb2.PingTestReport()
+        rtts = [record['rtt'] for record in self.records if 'rtt' in record]
+        report.resolution = tbportal.portal_pb2.PingTestReport.SUCCESS if rtts else tbportal.portal_pb2.PingTestReport.TIMEOUT
+        report.sent = self.send_count
+        report.received = len(rtts)
+        if rtts:
+            report.avg_latency_ms = int(round(sum(rtts) * 1000 / len(rtts)))
+            report.max_latency_ms = int(round(max(rtts) * 1000))
+        return report
+
     def OnTimeout(self):
         self.portal.RemoveSocketServer(self)
 
@@ -735,7 +792,8 @@ class PingTest(SocketServer):
         self.last_client_rand = client_rand
         for record in self.records:
             sent = record.get('sent')
-            if record['rand'] == server_rand and sent:
+            if record['rand'] == server_rand and sent and 'rtt' not in record:
+                record['rtt'] = time.time() - sent
                 self.recv_count += 1
                 if self.recv_count == len(self.records):
                     self.success = True
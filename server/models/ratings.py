@@ -0,0 +1,253 @@
+"""
+ratings.py
+
+Glicko-2 ratings, configured by MatchServiceConfig.rating_config.
+
+When players agree on how a match went, GameSession passes the result to
+AddMatchResult.  Results are held until the end of the rating period
+(rating_period_mins), then every rated player is updated at once: players who
+played get the usual Glicko-2 update from all their results, and everyone
+else's deviation grows towards max_deviation as described by
+deviation_decay_periods and typical_deviation.  A player who logs out is no
+longer rated, but the games they finished that period still count, for them and
+their opponents.
+
+Ratings live on the User (rating, rating_deviation and rating_volatility),
+which is where the matchmaker reads them.
+
+The update is done over arrays with NumPy if it's installed, or player by
+player in plain Python if it isn't.  See Glickman, "Example of the Glicko-2
+system" for the math.
+"""
+
+import math
+import time
+import logging
+import tornado.ioloop
+import server
+import server.config
+import server.stats
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Converts between the Glicko scale and the Glicko-2 scale.
+GLICKO2_SCALE = 173.7178
+
+# Volatility of a player with no games.
+DEFAULT_VOLATILITY = 0.06
+
+# The volatility update stops when it's this close.
+VOLATILITY_EPSILON = 0.000001
+
+def GetConfig():
+    return server.config.match_service_config.rating_config
+
+def GetInactiveDeviationIncrease():
+    """
+    Return c from the Glicko paper, squared: how much deviation variance a player
+    gains each period they don't play.
+    """
+    config = GetConfig()
+    return (config.max_deviation ** 2 - config.typical_deviation ** 2) / config.deviation_decay_periods
+
+class Ratings(object):
+    def __init__(self):
+        # users who have been rated, by user_id
+        self.players = {}
+        # (user, opponent, score) for every result this period, from both sides.  the
+        # users are held here so results stand even if someone logs out.
+        self.results = []
+        self.period_timer = tornado.ioloop.PeriodicCallback(lambda: self.RunRatingPeriod(), GetConfig().rating_period_mins * 60 * 1000)
+        server.stats.SetGauge('ratings.players', lambda: len(self.players))
+        server.stats.SetGauge('ratings.pending_results', lambda: len(self.results))
+
+    def StartRatingPeriods(self):
+        self.period_timer.start()
+
+    def AddMatchResult(self, p1, p2, score):
+        """
+        Record a match p1 scored score against p2 (1 for a win, 0.5 for a draw and
+        0 for a loss).  Ratings change at the end of the rating period.
+        """
+        self.players[p1.user_id] = p1
+        self.players[p2.user_id] = p2
+        self.results.append((p1, p2, score))
+        self.results.append((p2, p1, 1.0 - score))
+
+    def RemovePlayer(self, user):
+        """
+        Stop rating user once they've logged out.  Results from this period are still
+        counted at the end of it.
+        """
+        self.players.pop(user.user_id, None)
+
+    def RunRatingPeriod(self):
+        start = time.time()
+        players = dict(self.players)
+        for user, _, _ in self.results:
+            players.setdefault(user.user_id, user)
+        players = players.values()
+        index = dict((user.user_id, i) for i, user in enumerate(players))
+        results = [(index[p.user_id], index[o.user_id], s) for p, o, s in self.results]
+        self.results = []
+        logging.debug('rating period: {0} players, {1} results'.format(len(players), len(results) / 2))
+
+        update = UpdateRatingsNumpy if numpy else UpdateRatingsPython
+        ratings, deviations, volatilities = update(
+            [user.rating for user in players],
+            [user.rating_deviation for user in players],
+            [user.rating_volatility for user in players],
+            results)
+        for user, rating, deviation, volatility in zip(players, ratings, deviations, volatilities):
+            user.rating = rating
+            user.rating_deviation = deviation
+            user.rating_volatility = volatility
+
+        server.stats.Increment('ratings.periods')
+        server.stats.Observe('ratings.period_ms', (time.time() - start) * 1000)
+
+def UpdateVolatility(delta, phi, sigma, v, tau):
+    """
+    Step 5 of the Glicko-2 update for one player, by the Illinois algorithm.
+    """
+    a = math.log(sigma ** 2)
+    def f(x):
+        ex = math.exp(x)
+        return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a
+    if delta ** 2 > phi ** 2 + v:
+        B = math.log(delta ** 2 - phi ** 2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        B = a - k * tau
+
+    fA = f(A)
+    fB = f(B)
+    while abs(B - A) > VOLATILITY_EPSILON:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0:
+            A, fA = B, fB
+        else:
+            fA /= 2
+        B, fB = C, fC
+    return math.exp(A / 2)
+
+def UpdateRatingsPython(ratings, deviations, volatilities, results):
+    """
+    Run one rating period.  results are (player index, opponent index, score) for
+    every game in the period, once from each side.  Returns the new ratings,
+    deviations and volatilities.
+    """
+    config = GetConfig()
+    decay = GetInactiveDeviationIncrease()
+    mu = [(r - 1500) / GLICKO2_SCALE for r in ratings]
+    phi = [d / GLICKO2_SCALE for d in deviations]
+
+    v_inv = [0.0] * len(ratings)
+    gains = [0.0] * len(ratings)
+    for p, o, s in results:
+        g = 1 / math.sqrt(1 + 3 * phi[o] ** 2 / math.pi ** 2)
+        e = 1 / (1 + math.exp(-g * (mu[p] - mu[o])))
+        v_inv[p] += g ** 2 * e * (1 - e)
+        gains[p] += g * (s - e)
+
+    new_ratings = list(ratings)
+    new_deviations = list(deviations)
+    new_volatilities = list(volatilities)
+    for i in xrange(len(ratings)):
+        if v_inv[i] == 0:
+            deviation = math.sqrt(deviations[i] ** 2 + decay)
+        else:
+            v = 1 / v_inv[i]
+            sigma = UpdateVolatility(v * gains[i], phi[i], volatilities[i], v, config.tau)
+            phi_star = math.sqrt(phi[i] ** 2 + sigma ** 2)
+            new_phi = 1 / math.sqrt(1 / phi_star ** 2 + v_inv[i])
+            new_ratings[i] = 1500 + GLICKO2_SCALE * (mu[i] + new_phi ** 2 * gains[i])
+            new_volatilities[i] = sigma
+            deviation = GLICKO2_SCALE * new_phi
+        new_deviations[i] = min(max(deviation, config.min_deviation), config.max_deviation)
+    return new_ratings, new_deviations, new_volatilities
+
+def UpdateRatingsNumpy(ratings, deviations, volatilities, results):
+    """
+    Same as UpdateRatingsPython, over arrays.
+    """
+    config = GetConfig()
+    decay = GetInactiveDeviationIncrease()
+    tau = config.tau
+    ratings = numpy.array(ratings, dtype=numpy.float64)
+    deviations = numpy.array(deviations, dtype=numpy.float64)
+    volatilities = numpy.array(volatilities, dtype=numpy.float64)
+    n = len(ratings)
+    mu = (ratings - 1500) / GLICKO2_SCALE
+    phi = deviations / GLICKO2_SCALE
+
+    if results:
+        columns = numpy.array(results, dtype=numpy.float64)
+        p = columns[:, 0].astype(numpy.intp)
+        o = columns[:, 1].astype(numpy.intp)
+        s = columns[:, 2]
+        g = 1 / numpy.sqrt(1 + 3 * phi[o] ** 2 / math.pi ** 2)
+        e = 1 / (1 + numpy.exp(-g * (mu[p] - mu[o])))
+        v_inv = numpy.bincount(p, g ** 2 * e * (1 - e), minlength=n)
+        gains = numpy.bincount(p, g * (s - e), minlength=n)
+    else:
+        v_inv = numpy.zeros(n)
+        gains = numpy.zeros(n)
+
+    new_deviations = numpy.sqrt(deviations ** 2 + decay)
+    active = numpy.nonzero(v_inv > 0)[0]
+    if len(active):
+        v = 1 / v_inv[active]
+        delta = v * gains[active]
+        phi_a = phi[active]
+        sigma = volatilities[active]
+
+        # step 5, the Illinois algorithm for every active player at once.  players
+        # drop out of the loop as they converge.
+        a = numpy.log(sigma ** 2)
+        def f(x, delta, phi, v, a):
+            ex = numpy.exp(x)
+            return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+        A = a.copy()
+        B = numpy.empty_like(a)
+        big = delta ** 2 > phi_a ** 2 + v
+        B[big] = numpy.log(delta[big] ** 2 - phi_a[big] ** 2 - v[big])
+        small = numpy.nonzero(~big)[0]
+        k = numpy.ones(len(small))
+        while len(small):
+            low = f(a[small] - k * tau, delta[small], phi_a[small], v[small], a[small]) < 0
+            B[small[~low]] = a[small[~low]] - k[~low] * tau
+            small, k = small[low], k[low] + 1
+
+        fA = f(A, delta, phi_a, v, a)
+        fB = f(B, delta, phi_a, v, a)
+        todo = numpy.nonzero(numpy.abs(B - A) > VOLATILITY_EPSILON)[0]
+        while len(todo):
+            At, Bt, fAt, fBt = A[todo], B[todo], fA[todo], fB[todo]
+            C = At + (At - Bt) * fAt / (fBt - fAt)
+            fC = f(C, delta[todo], phi_a[todo], v[todo], a[todo])
+            swap = fC * fBt <= 0
+            A[todo] = numpy.where(swap, Bt, At)
+            fA[todo] = numpy.where(swap, fBt, fAt / 2)
+            B[todo] = C
+            fB[todo] = fC
+            todo = todo[numpy.abs(C - A[todo]) > VOLATILITY_EPSILON]
+        sigma = numpy.exp(A / 2)
+
+        phi_star = numpy.sqrt(phi_a ** 2 + sigma ** 2)
+        new_phi = 1 / numpy.sqrt(1 / phi_star ** 2 + v_inv[active])
+        ratings[active] = 1500 + GLICKO2_SCALE * (mu[active] + new_phi ** 2 * gains[active])
+        volatilities[active] = sigma
+        new_deviations[active] = GLICKO2_SCALE * new_phi
+
+    new_deviations = numpy.clip(new_deviations, config.min_deviation, config.max_deviation)
+    return ratings.tolist(), new_deviations.tolist(), volatilities.tolist()
@@ -5,72 +5,144 @@ User model definition and registry.
 """
 
 import server
+import server.stats
+import server.config
+import server.models.events
+import server.models.ratings
 import logging
-import tbmatch.event_pb2
+import tornado.websocket
 import tbmatch.match_pb2
-import tbrpc.tbrpc_pb2
 
 class User(object):
     def __init__(self):
         self.user_id = server.GetNextUniqueId()
-        self.events = []
+        self.session_key = None
+        self.events = server.models.events.EventQueue(server.config.event_queue_capacity)
         self.handle = 'User %03d' % server.GetNextUniqueId()
         self.given_name = 'Ana Itza'
         self.locale = 'en-US'
-        self.get_event_handler  = None
+        self.rating = server.config.match_service_config.unrated_glicko_rating
+        self.rating_deviation = server.config.match_service_config.rating_config.max_deviation
+        self.rating_volatility = server.models.ratings.DEFAULT_VOLATILITY
+        self.poll = None
+        self.socket = None
+        self.pushed_event_id = 0
+        self.flush_scheduled = False
         self.prefs = tbmatch.match_pb2.PlayerPreferences()
 
     def Log(self, s):
-        logging.debug('[user:%d %s] %s' % (self.user_id, self.handle, s))
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug('[user:%d %s] %s' % (self.user_id, self.handle, s))
         
     def SetPlayerPreferences(self, prefs):
         self.prefs.CopyFrom(prefs)
 
     def SendEvent(self, e):
         # sometimes it's useful to broadcast one event to multiple parties.
-        # make a copy of the event structure here so those have the proper
-        # event id
-        event = tbmatch.event_pb2.Event()
-        event.CopyFrom(e)
-
-        event.event_id = server.GetNextUniqueId()
-        self.events.append(event)
-        self.Log('appending event to list (id:{0})'.format(event.event_id))
-
-        handler = self.get_event_handler 
-        if handler:
-            self.Log('calling pending get event handler to send events')
-            self.SendPendingEvents(handler)
-            self.get_event_handler  = None
+        # callers doing that should serialize it once with EncodeEvent and
+        # pass the result to everyone.  each user's queue adds its own event id.
+        if not isinstance(e, server.models.events.EncodedEvent):
+            e = server.models.events.EncodeEvent(e)
+
+        event_id = server.GetNextUniqueId()
+        self.events.Append(event_id, e)
+        self.Log('appending event to list (id:{0})'.format(event_id))
+
+        # don't reply to a pending poll right away.  whatever sent this event is
+        # likely to send more in this same tick (e.g. a lobby join and several
+        # updates), so wait until the ioloop comes around again and send them all
+        # in one reply.
+        if (self.poll or self.socket) and not self.flush_scheduled:
+            self.flush_scheduled = True
+            server.ioloop.add_callback(lambda: self.FlushEvents())
+
+    def FlushEvents(self):
+        self.flush_scheduled = False
+        if self.socket:
+            self.PushEvents()
+        elif self.poll and len(self.events) > 0:
+            self.Log('completing pending get event to send events')
+            self.SendPendingEvents()
 
     def RemoveEvents(self, lastId):
         # drop all the events which have been ack'ed.
         self.Log('removing events up to %d' % lastId)
-        while len(self.events) > 0 and lastId >= self.events[0].event_id:
-            event = self.events.pop(0)
-
-    def SendPendingEvents(self, handler):
-        if len(self.events) == 0:
-            self.Log('no events now.  holding into event handler')
-            self.get_event_handler = handler
+        self.events.Acknowledge(lastId)
+
+    def WaitForEvents(self, handler):
+        """
+        Returns a serialized GetEventResult holding all the pending events.  If there
+        aren't any events yet, returns a Future which resolves once someone calls
+        SendEvent, or to an empty reply once the wait times out.
+        """
+        if self.poll:
+            # only one poll per session.  the old one was abandoned by the client,
+            # so let it go.
+            self.Log('replacing pending get event request')
+            server.stats.Increment('events.poll_replaced')
+            self.poll.Finish(None)
+
+        if len(self.events) > 0:
+            return self.EncodePendingEvents()
+
+        self.Log('no events now.  holding onto get event request')
+        self.poll = server.models.events.LongPoll(handler, server.config.event_config.change_wait_timeout_ms, lambda p: self.OnPollFinished(p))
+        return self.poll.future
+
+    def AttachSocket(self, socket):
+        """
+        Push events to socket as they're sent instead of waiting for GetEvent.  Events
+        stay queued until the client acknowledges them, so if the socket goes away
+        they're still there for the next poll or socket.
+        """
+        if self.socket:
+            self.Log('replacing event socket')
+            self.socket.close()
+        self.socket = socket
+        self.pushed_event_id = 0
+        self.PushEvents()
+
+    def DetachSocket(self, socket):
+        if self.socket is socket:
+            self.socket = None
+
+    def PushEvents(self):
+        if len(self.events) == 0 or self.events.GetLastEventId() <= self.pushed_event_id:
+            return
+        self.Log('pushing events after {0} (version:{1})'.format(self.pushed_event_id, self.events.GetLastEventId()))
+        content = self.events.EncodeResult(self.pushed_event_id)
+        try:
+            self.socket.write_message(content, binary=True)
+        except tornado.websocket.WebSocketClosedError:
+            # the socket went away before tornado told us.  keep the events queued
+            # for the next poll or socket.
+            self.Log('event socket closed.  holding onto events')
+            self.socket = None
             return
+        self.pushed_event_id = self.events.GetLastEventId()
+        server.stats.Increment('events.socket_pushes')
 
-        response = tbmatch.event_pb2.GetEventResult()
-        response.version = str(self.events[-1].event_id)
-        for event in self.events:
-            response.event.add().CopyFrom(event)
-        self.Log('sending events {0}'.format(response))
+    def OnPollFinished(self, poll):
+        if self.poll is poll:
+            self.poll = None
 
-        result = tbrpc.tbrpc_pb2.Result()
-        result.result = tbrpc.tbrpc_pb2.S_SUCCESS
-        result.content = response.SerializeToString()
+    def SendPendingEvents(self):
+        self.poll.Finish(self.EncodePendingEvents())
 
-        handler.write(result.SerializeToString())
-        handler.finish()
+    def EncodePendingEvents(self):
+        if self.events.resync_event_id is not None:
+            self.Log('events were dropped.  asking client to resync')
+        self.Log('sending {0} events (version:{1})'.format(len(self.events), self.events.GetLastEventId()))
+        server.stats.Observe('events.per_reply', len(self.events))
+        return self.events.EncodeResult()
 
 class Users(object):
     def __init__(self):
         self.users = {}
+        server.stats.SetGauge('events.queue_depth_total', lambda: sum(len(u.events) for u in self.users.itervalues()))
+        server.stats.SetGauge('events.queue_depth_max', lambda: max([len(u.events) for u in self.users.itervalues()] or [0]))
+        server.stats.SetGauge('events.sockets', lambda: sum(1 for u in self.users.itervalues() if u.socket))
+        server.stats.SetGauge('events.users_resync_required', lambda: sum(1 for u in self.users.itervalues() if u.events.resync_event_id is not None))
 
     def GetCurrentUser(self, handler):
         session_key = handler.get_cookie('session')
@@ -81,11 +153,30 @@ class Users(object):
     def CreateSession(self, handler, session_key):
         logging.debug('creating new user session with key {0}.'.format(session_key))
         handler.set_cookie('session', session_key)
-        self.users[session_key] = User()
+        if session_key in self.users:
+            # the same ticket redeemed twice.  the new session replaces the old one.
+            self.EndSession(session_key)
+        user = User()
+        user.session_key = session_key
+        self.users[session_key] = user
 
     def DestroySession(self, handler):
         session_key = handler.get_cookie('session')
         if session_key:
-            user = self.users[session_key]
-            logging.debug('destroying session for {0} {1}.'.format(session_key, user.handle))
-            del self.users[session_key]
+            self.EndSession(session_key)
+
+    def EndSession(self, session_key):
+        user = self.users[session_key]
+        logging.debug('destroying session for {0} {1}.'.format(session_key, user.handle))
+        if user.poll:
+            user.poll.Finish(None)
+        if user.socket:
+            user.socket.close()
+            user.socket = None
+        server.lobbies.RemoveUserFromLobby(user)
+        server.ratings.RemovePlayer(user)
+        server.pings.Remove(user)
+        del self.users[session_key]
+
+    def HasSession(self, user):
+        return self.users.get(user.session_key) is user
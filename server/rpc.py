@@ -6,7 +6,14 @@ makes it really easy to implement RPCs.  Most of the heavy lifting is done by fl
 """
 
 import logging
+import importlib
+import tornado.gen
+import tornado.web
+import tornado.concurrent
 import google.protobuf.json_format
+import google.protobuf.symbol_database
+import server.config
+import tbrpc.tbrpc_pb2
 
 log = logging.getLogger("tornado.general")
 log.debug('loading server')
@@ -31,11 +38,22 @@ def HandleRpc(route):
 
     The type of request and response are determined by the service proto definition.
     For example, for Login, the type of request is tbmatch.session_pb2.LoginRequest().
-    One easy way to find the type of your RPC is to just look for the app route in
-    routes.py and read the code.
+    One easy way to find the type of your RPC is to look up the service which declares
+    it in generated_routes.py and read the .proto.
 
     RPC handlers should do their work, write to response, and return.  If something
-    goes wrong, raise an exception.
+    goes wrong, raise an exception.  A handler which has already serialized its
+    response can return those bytes instead of writing to response.
+
+    Handlers which need to wait on something (a timer, another client, etc.) shouldn't
+    block the ioloop.  Instead they can return a Future, and the reply is sent once it
+    resolves (to None, or to the serialized response):
+
+       @server.rpc.HandleRpc('Login')
+       @tornado.gen.coroutine
+       def Login(request, response, handler):
+           yield tornado.gen.sleep(1)
+           # do something here.
     """
     def AddRoute(fn):
         log.debug('adding rpc handler to {0}'.format(route))
@@ -44,12 +62,130 @@ def HandleRpc(route):
     
 def GetRouteHandler(route):
     """
-    Used by routes.py to lookup RPC handlers in the flask route handler.  If you're
-    implementing an RPC, you can just ignore this one.
+    Used by the RpcDispatchHandler to lookup RPC handlers.  If you're implementing
+    an RPC, you can just ignore this one.
     """
     return _RPC_HANDLERS.get(route, None)
 
+class RpcMethod(object):
+    """
+    One RPC entry point advertized by a service.  The request and response message
+    classes are looked up in the service descriptor the first time the method is
+    called and cached from then on.
+    """
+    def __init__(self, name, module_name, service_name):
+        self.name = name
+        self.module_name = module_name
+        self.service_name = service_name
+        self.request_class = None
+        self.response_class = None
+
+    def Resolve(self):
+        if self.request_class:
+            return
+
+        # importing the module which declares the service also imports everything
+        # it depends on, so both message types are in the symbol database afterward.
+        module = importlib.import_module(self.module_name)
+        service = module.DESCRIPTOR.services_by_name[self.service_name.split('.')[-1]]
+        method = service.methods_by_name[self.name]
+
+        symbols = google.protobuf.symbol_database.Default()
+        self.response_class = symbols.GetSymbol(method.output_type.full_name)
+        self.request_class = symbols.GetSymbol(method.input_type.full_name)
+
+_RPC_METHODS = {}
+def RegisterMethods(methods):
+    """
+    Used by generated_routes.py to tell the dispatcher about every (name, module, service)
+    RPC it can serve.
+    """
+    for name, module_name, service_name in methods:
+        _RPC_METHODS[name] = RpcMethod(name, module_name, service_name)
+
+def GetMethod(name):
+    return _RPC_METHODS.get(name, None)
+
+class RpcDispatchHandler(tornado.web.RequestHandler):
+    """
+    Serves every RPC.  Parses the request, calls the handler registered with
+    HandleRpc and wraps the response in a tbrpc.Result.
+    """
+    def initialize(self):
+        self.close_callbacks = []
+
+    def AddCloseCallback(self, callback):
+        """
+        Used by handlers which hold onto a request to find out if the client hangs up
+        before we've replied.
+        """
+        self.close_callbacks.append(callback)
+
+    def on_connection_close(self):
+        callbacks, self.close_callbacks = self.close_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    @tornado.gen.coroutine
+    def post(self, name):
+        method = GetMethod(name)
+        if not method:
+            raise tornado.web.HTTPError(404)
+        method.Resolve()
+
+        request = method.request_class()
+        request.ParseFromString(self.request.body)
+        trace = ShouldTraceRpc(name)
+        if trace:
+            LogProto('received {0} '.format(name), request)
+
+        handler = GetRouteHandler(name)
+        if not handler:
+            raise NotImplementedError('{0} {1} not implemented!'.format(method.service_name, name))
+
+        response = method.response_class()
+        content = handler(request, response, self)
+        if tornado.concurrent.is_future(content):
+            # the handler finishes asynchronously.  let the ioloop get on with
+            # other work until it does.
+            content = yield content
+        if not isinstance(content, bytes):
+            content = response.SerializeToString()
+        elif trace:
+            response.ParseFromString(content)
+        if trace:
+            LogProto('replying with ', response)
+
+        # wrap the response in a tbrpc.Result and return
+        result = tbrpc.tbrpc_pb2.Result()
+        result.result = tbrpc.tbrpc_pb2.S_SUCCESS
+        result.content = content
+        self.write(result.SerializeToString())
+
+_TRACE_COUNTS = {}
+def ShouldTraceRpc(name):
+    """
+    Decide whether the request and response of this call to the named RPC should be
+    logged.  Formatting a proto as JSON is the most expensive part of a small RPC, so
+    don't bother unless DEBUG logging is on, the RPC is in server.config.rpc_trace_allowlist
+    (or the list is empty) and this is the 1 in server.config.rpc_trace_sample_rate call
+    we're sampling.
+    """
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return False
+
+    allowlist = server.config.rpc_trace_allowlist
+    if allowlist and name not in allowlist:
+        return False
+
+    count = _TRACE_COUNTS.get(name, 0)
+    _TRACE_COUNTS[name] = count + 1
+    return count % max(server.config.rpc_trace_sample_rate, 1) == 0
+
 def LogProto(reason, proto):
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+
     json = google.protobuf.json_format.MessageToJson(proto)
     for line in json.split('\n'):
         logging.debug(reason + line)
@@ -1,20 +1,58 @@
+import logging
+import tornado.websocket
+import google.protobuf.message
 import server.rpc
 import tbmatch.event_pb2
-import tornado.web
-import logging
-
-class GetEventHandler(tornado.web.RequestHandler):
-    @tornado.web.asynchronous
-    def post(self):
-        request = tbmatch.event_pb2.GetEventRequest()
-        request.ParseFromString(self.request.body)
-        logging.debug('received GetEvent {0}'.format(str(request)))
 
-        user = server.users.GetCurrentUser(self)        
-        if request.version:
-            user.RemoveEvents(int(request.version))
-        user.SendPendingEvents(self)
+@server.rpc.HandleRpc('GetEvent')
+def GetEvent(request, response, handler):
+    """
+    Acknowledge the events up to request.version and reply with the rest.  If there
+    aren't any, the request is held open until an event arrives or
+    event_config.change_wait_timeout_ms passes.
+    """
+    user = server.users.GetCurrentUser(handler)
+    if request.version:
+        user.RemoveEvents(int(request.version))
+    return user.WaitForEvents(handler)
 
 @server.rpc.HandleRpc('EventPing')
 def PingTest(request, response, handler):
     server.users.GetCurrentUser(handler)
+
+class EventSocketHandler(tornado.websocket.WebSocketHandler):
+    """
+    Push transport for the EventService.  Every binary message sent to the client is
+    a serialized GetEventResult holding the events sent since the last one.  The
+    client acknowledges by sending a serialized GetEventRequest with the version of
+    the last event it processed, just like it would when polling GetEvent.  Sockets
+    without a live session, or which send something else, are closed.
+    """
+    def open(self):
+        try:
+            self.user = server.users.GetCurrentUser(self)
+        except KeyError:
+            # a stale cookie, e.g. from before the server restarted.
+            self.user = None
+        if not self.user:
+            self.close()
+            return
+        self.user.AttachSocket(self)
+
+    def on_message(self, message):
+        if not self.user:
+            return
+        request = tbmatch.event_pb2.GetEventRequest()
+        try:
+            request.ParseFromString(message)
+            version = int(request.version or 0)
+        except (google.protobuf.message.DecodeError, ValueError):
+            logging.warning('closing event socket for user {0} after a malformed message'.format(self.user.user_id))
+            self.close()
+            return
+        if version:
+            self.user.RemoveEvents(version)
+
+    def on_close(self):
+        if self.user:
+            self.user.DetachSocket(self)
@@ -1,5 +1,6 @@
 import server
 import server.rpc
+import server.stats
 import server.config
 import tbmatch.event_pb2
 import uuid
@@ -8,7 +9,7 @@ import uuid
 def CreateLobby(request, response, handler):
     """
     Create a new lobby and join it, with the creator as owner.
-	    Fails if user is already in a lobby.
+	    Leaves any lobby the user is already in.
 	    Success confirmed by LobbyJoin event.
     """
     user = server.users.GetCurrentUser(handler)
@@ -32,8 +33,8 @@ def LobbySetReady(request, response, handler):
     if lobby:
         lobby.SetUserReady(user, request.ready, request.character)
 
-    # check to see if both players are ready, if so start the match
-    lobby.StartMatchIfReady()
+        # check to see if both players are ready, if so start the match
+        lobby.StartMatchIfReady()
     
 @server.rpc.HandleRpc('GetLobbyJoinCode')
 def GetLobbyJoinCode(request, response, handler):
@@ -43,7 +44,8 @@ def GetLobbyJoinCode(request, response, handler):
 @server.rpc.HandleRpc('JoinLobbyByCode')
 def JoinLobbyByCode(request, response, handler):
     """
-    Join an existing lobby via a string code inputted by the user.
+    Join an existing lobby via a string code inputted by the user.  If the lobby is
+    full they're sent an E_LOBBY_LEAVE for it instead of the E_LOBBY_JOIN.
     """
 
     user = server.users.GetCurrentUser(handler)
@@ -51,6 +53,10 @@ def JoinLobbyByCode(request, response, handler):
     code = request.code
     lobby = server.lobbies.FindLobbyWithCode(code)
     if lobby:
+        if lobby.IsFull():
+            server.stats.Increment('lobbies.join_full')
+            lobby.SendLeave(user, tbmatch.event_pb2.LobbyLeaveEvent.REMOVED)
+            return
         lobby.AddUser(user)
 
 @server.rpc.HandleRpc('LeaveLobby')
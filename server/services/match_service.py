@@ -41,6 +41,11 @@ def GetMatch(request, response, handler):
 
     server.matchmaker.JoinQueue(user, gameplay_options)
 
+@server.rpc.HandleRpc('ResumeGetMatch')
+def ResumeGetMatch(request, response, handler):
+    user = server.users.GetCurrentUser(handler)
+    server.matchmaker.ResumeQueue(user)
+
 @server.rpc.HandleRpc('CancelGetMatch')
 def CancelGetMatch(request, response, handler):
     user = server.users.GetCurrentUser(handler)
@@ -1,5 +1,6 @@
 import server.rpc
-import time
+import server.config
+import tornado.gen
 import uuid
 
 @server.rpc.HandleRpc('Login')
@@ -16,9 +17,11 @@ def GetGameSessionTicket(request, response, handler):
     response.nonce = str(uuid.uuid4())
 
 @server.rpc.HandleRpc('RedeemGameSessionTicket')
+@tornado.gen.coroutine
 def RedeemGameSessionTicket(request, response, handler):
-    # TODO:  Remove this sleep statement and instead implement an asynchronous event handler in the same style as GetEvent
-    time.sleep(server.config.game_session_ticket_wait_interval_ms)
+    # give the client time to set up its UI.  this is a timeout on the ioloop, so
+    # everyone else's RPCs and portal traffic keep flowing while we wait.
+    yield tornado.gen.sleep(server.config.game_session_ticket_wait_interval_ms)
 
     session_key = request.nonce
     server.users.CreateSession(handler, session_key)
@@ -0,0 +1,65 @@
+"""
+stats.py
+
+Simple in-process counters, gauges and histograms.  Anything in the server can
+record stats here, and they're served up as JSON from /_01/stats so you can
+see what a running server is up to.
+"""
+
+import collections
+import tornado.web
+
+# Number of recent samples each histogram keeps to compute percentiles from.
+HISTOGRAM_WINDOW = 1024
+
+_COUNTERS = collections.defaultdict(int)
+_GAUGES = {}
+_HISTOGRAMS = {}
+
+class Histogram(object):
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples = collections.deque(maxlen=HISTOGRAM_WINDOW)
+
+    def Observe(self, value):
+        self.count += 1
+        self.total += value
+        self.samples.append(value)
+
+    def Summarize(self):
+        samples = sorted(self.samples)
+        summary = { 'count' : self.count }
+        if samples:
+            summary['mean'] = self.total / self.count
+            for p in (50, 90, 99):
+                summary['p%d' % p] = samples[min(len(samples) - 1, len(samples) * p / 100)]
+            summary['max'] = samples[-1]
+        return summary
+
+def Increment(name, amount=1):
+    _COUNTERS[name] += amount
+
+def SetGauge(name, fn):
+    """
+    Register fn to be called for the current value of name whenever stats are read.
+    """
+    _GAUGES[name] = fn
+
+def Observe(name, value):
+    histogram = _HISTOGRAMS.get(name)
+    if not histogram:
+        histogram = _HISTOGRAMS[name] = Histogram()
+    histogram.Observe(value)
+
+def Snapshot():
+    stats = dict(_COUNTERS)
+    for name, fn in _GAUGES.iteritems():
+        stats[name] = fn()
+    for name, histogram in _HISTOGRAMS.iteritems():
+        stats[name] = histogram.Summarize()
+    return stats
+
+class StatsHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write(Snapshot())
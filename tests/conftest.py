@@ -0,0 +1,15 @@
+"""
+conftest.py
+
+Importing server parses the command line for tornado's options, which fails on
+pytest's own flags.  Import it here first with them hidden.
+"""
+
+import sys
+
+argv = sys.argv
+sys.argv = argv[:1]
+try:
+    import server
+finally:
+    sys.argv = argv
@@ -0,0 +1,40 @@
+import random
+import itertools
+import server.models.blossom
+
+
+def test_matching_agrees_with_brute_force():
+    rng = random.Random(1)
+    for _ in xrange(500):
+        n = rng.randint(1, 8)
+        density = rng.random()
+        edges = [(i, j, rng.randint(0, 20)) for i, j in itertools.combinations(xrange(n), 2) if rng.random() < density]
+        mate = server.models.blossom.MaxWeightMatching(n, edges)
+        weights = dict(((i, j), weight) for i, j, weight in edges)
+        pairs = [(v, mate[v]) for v in xrange(n) if mate[v] > v]
+        assert all(mate[u] == v for v, u in pairs)
+        assert (len(pairs), sum(weights[p] for p in pairs)) == best_matching(n, weights)
+
+
+def test_matching_prefers_more_pairs_to_more_weight():
+    # 0-1 alone is heaviest, but 0-2 and 1-3 make two pairs.
+    edges = [(0, 1, 100), (0, 2, 1), (1, 3, 1)]
+    mate = server.models.blossom.MaxWeightMatching(4, edges)
+    assert mate == [2, 3, 0, 1]
+
+
+def test_matching_gives_up_at_deadline():
+    assert server.models.blossom.MaxWeightMatching(2, [(0, 1, 1)], deadline=0) is None
+
+
+def best_matching(n, weights, first=0):
+    # (pairs, weight) of the best matching of vertices first and up, by trying them all.
+    if first >= n - 1:
+        return (0, 0)
+    best = best_matching(n, weights, first + 1)
+    for other in xrange(first + 1, n):
+        if (first, other) in weights:
+            rest = dict((k, w) for k, w in weights.iteritems() if first not in k and other not in k)
+            pairs, weight = best_matching(n, rest, first + 1)
+            best = max(best, (pairs + 1, weight + weights[(first, other)]))
+    return best
@@ -0,0 +1,55 @@
+import pytest
+import server.models.events
+import tbmatch.event_pb2
+
+LOBBY_JOIN_FIELD = tbmatch.event_pb2.Event.DESCRIPTOR.fields_by_name['lobby_join'].number
+
+# payload sizes around where the length prefix grows a byte.
+PAYLOAD_SIZES = [0, 1, 127, 128, 300, 16383, 16384, 70000]
+
+
+def make_lobby_join(size):
+    event = tbmatch.event_pb2.Event()
+    event.type = tbmatch.event_pb2.Event.E_LOBBY_JOIN
+    event.lobby_join.lobby.lobby_id = 12345
+    event.lobby_join.lobby.name = 'x' * size
+    return event
+
+
+@pytest.mark.parametrize('value', [0, 1, 127, 128, 300, 16383, 16384, 2 ** 31, 2 ** 62])
+def test_varint_matches_protobuf(value):
+    event = tbmatch.event_pb2.Event()
+    event.event_id = value
+    assert server.models.events.EncodeTag(1, server.models.events.WIRE_VARINT) + server.models.events.EncodeVarint(value) == event.SerializeToString()
+
+
+@pytest.mark.parametrize('size', PAYLOAD_SIZES)
+def test_spliced_event_matches_protobuf(size):
+    event = make_lobby_join(size)
+    payload = event.lobby_join.SerializeToString()
+    encoded = server.models.events.EncodeEventWithPayload(event.type, LOBBY_JOIN_FIELD, payload)
+    assert encoded.body == event.SerializeToString()
+
+    for event_id in (1, 300, 2 ** 40):
+        event.event_id = event_id
+        spliced = server.models.events.EncodeEventForUser(event_id, encoded)
+        assert spliced == event.SerializeToString()
+        parsed = tbmatch.event_pb2.Event()
+        parsed.ParseFromString(spliced)
+        assert parsed == event
+
+
+def test_spliced_result_matches_protobuf():
+    result = tbmatch.event_pb2.GetEventResult()
+    frames = []
+    for event_id, size in enumerate(PAYLOAD_SIZES, 1):
+        event = make_lobby_join(size)
+        encoded = server.models.events.EncodeEventWithPayload(event.type, LOBBY_JOIN_FIELD, event.lobby_join.SerializeToString())
+        frames.append(server.models.events.EncodeResultEvent(event_id, encoded))
+        event.event_id = event_id
+        result.event.add().CopyFrom(event)
+    assert ''.join(frames) == result.SerializeToString()
+
+    parsed = tbmatch.event_pb2.GetEventResult()
+    parsed.ParseFromString(''.join(frames))
+    assert parsed == result
@@ -0,0 +1,240 @@
+import time
+import threading
+import tornado.gen
+import tornado.ioloop
+import tornado.httpclient
+import tornado.websocket
+import tbmatch.event_pb2
+import tbmatch.lobby_pb2
+import game_client
+import rpc_client
+
+def test_get_event_waits_for_event():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = find_event(c1.DoGetEvents(), tbmatch.event_pb2.Event.E_LOBBY_JOIN).lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    # nothing is pending, so the poll should be held open...
+    events = []
+    poll = threading.Thread(target=lambda: events.extend(c1.DoGetEvents()))
+    poll.start()
+    time.sleep(0.5)
+    assert poll.is_alive()
+
+    # ...until someone else joins the lobby.
+    c2 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    request.code = code
+    c2.JoinLobbyByCode(request)
+
+    poll.join(5)
+    assert not poll.is_alive()
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_UPDATE)
+
+def test_event_queue_overflow_requests_resync():
+    c = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c.CreateLobby(request)
+
+    # every ready toggle sends a lobby update.  never acknowledge them, so the
+    # queue overflows.
+    request = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    for i in xrange(300):
+        request.ready = i % 2 == 0
+        c.LobbySetReady(request)
+
+    events = c.DoGetEvents()
+    assert [e.type for e in events].count(tbmatch.event_pb2.Event.E_FILTER_CHANGED) == 1
+    assert len(events) < 300
+    assert [e.event_id for e in events] == sorted(e.event_id for e in events)
+
+def test_event_queue_resync_survives_lost_reply():
+    c = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c.CreateLobby(request)
+
+    request = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    for i in xrange(300):
+        request.ready = i % 2 == 0
+        c.LobbySetReady(request)
+
+    # the first reply never makes it, so nothing is acknowledged...
+    version = c.get_event_version
+    assert find_event(c.DoGetEvents(), tbmatch.event_pb2.Event.E_FILTER_CHANGED)
+    c.get_event_version = version
+
+    # ...and the client is still told to resync next time.
+    request = tbmatch.event_pb2.GetEventRequest()
+    request.version = version
+    result = c.GetEvent(request)
+    resync = find_event(result.event, tbmatch.event_pb2.Event.E_FILTER_CHANGED)
+    assert resync and resync.event_id <= int(result.version)
+    c.get_event_version = result.version
+
+    # once it's acknowledged, it's gone.
+    request = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    request.ready = True
+    c.LobbySetReady(request)
+    assert not find_event(c.DoGetEvents(), tbmatch.event_pb2.Event.E_FILTER_CHANGED)
+
+def test_new_poll_replaces_pending_poll():
+    c = game_client.GameClient()
+    first = []
+    first_poll = threading.Thread(target=lambda: first.extend(c.DoGetEvents()))
+    first_poll.start()
+    time.sleep(0.5)
+    assert first_poll.is_alive()
+
+    # poll again from the same session on another connection.  the first poll
+    # should be let go with no events.
+    other = rpc_client.RpcClient()
+    other.session.cookies.update(c.session.cookies)
+    second = []
+    second_poll = threading.Thread(target=lambda: second.extend(other.GetEvent(tbmatch.event_pb2.GetEventRequest()).event))
+    second_poll.start()
+    first_poll.join(5)
+    assert not first_poll.is_alive()
+    assert len(first) == 0
+
+    # the second poll is the one which gets the next event.
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c.CreateLobby(request)
+    second_poll.join(5)
+    assert not second_poll.is_alive()
+    assert find_event(second, tbmatch.event_pb2.Event.E_LOBBY_JOIN)
+
+def test_events_from_one_rpc_arrive_together():
+    c = game_client.GameClient()
+    events = []
+    poll = threading.Thread(target=lambda: events.extend(c.DoGetEvents()))
+    poll.start()
+    time.sleep(0.5)
+
+    # creating a lobby sends both a join and an owner update.  the pending poll
+    # should get them in one reply.
+    other = rpc_client.RpcClient()
+    other.session.cookies.update(c.session.cookies)
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    other.CreateLobby(request)
+
+    poll.join(5)
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_JOIN)
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_UPDATE)
+
+def test_event_socket_pushes_events():
+    c = game_client.GameClient()
+
+    @tornado.gen.coroutine
+    def ReadPushedEvents():
+        request = tornado.httpclient.HTTPRequest('ws://localhost:1337/_01/events',
+                                                 headers={ 'Cookie' : 'session=' + c.session.cookies['session'] })
+        socket = yield tornado.websocket.websocket_connect(request)
+
+        request = tbmatch.lobby_pb2.CreateLobbyRequest()
+        request.type = tbmatch.lobby_pb2.LT_QUEUED
+        c.CreateLobby(request)
+
+        result = tbmatch.event_pb2.GetEventResult()
+        result.ParseFromString((yield socket.read_message()))
+
+        # acknowledge everything we were sent, then hang up.
+        ack = tbmatch.event_pb2.GetEventRequest()
+        ack.version = result.version
+        socket.write_message(ack.SerializeToString(), binary=True)
+        yield tornado.gen.sleep(0.25)
+        socket.close()
+        raise tornado.gen.Return(result.event)
+
+    events = tornado.ioloop.IOLoop.current().run_sync(ReadPushedEvents, timeout=5)
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_JOIN)
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_UPDATE)
+
+    # the pushed events were acknowledged, so polling only gets the new ones.
+    request = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    request.ready = True
+    c.LobbySetReady(request)
+    events = c.DoGetEvents()
+    assert not find_event(events, tbmatch.event_pb2.Event.E_LOBBY_JOIN)
+    assert find_event(events, tbmatch.event_pb2.Event.E_LOBBY_UPDATE)
+
+def test_event_socket_with_stale_session_is_closed():
+    @tornado.gen.coroutine
+    def Connect():
+        request = tornado.httpclient.HTTPRequest('ws://localhost:1337/_01/events',
+                                                 headers={ 'Cookie' : 'session=not-a-session' })
+        socket = yield tornado.websocket.websocket_connect(request)
+        raise tornado.gen.Return((yield socket.read_message()))
+
+    assert tornado.ioloop.IOLoop.current().run_sync(Connect, timeout=5) is None
+
+def test_event_socket_closes_on_malformed_message():
+    c = game_client.GameClient()
+
+    @tornado.gen.coroutine
+    def SendGarbage():
+        request = tornado.httpclient.HTTPRequest('ws://localhost:1337/_01/events',
+                                                 headers={ 'Cookie' : 'session=' + c.session.cookies['session'] })
+        socket = yield tornado.websocket.websocket_connect(request)
+        socket.write_message('\xff\xff\xff', binary=True)
+        raise tornado.gen.Return((yield socket.read_message()))
+
+    assert tornado.ioloop.IOLoop.current().run_sync(SendGarbage, timeout=5) is None
+
+    # nothing was acknowledged, and the session still works.
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c.CreateLobby(request)
+    assert find_event(c.DoGetEvents(), tbmatch.event_pb2.Event.E_LOBBY_JOIN)
+
+def test_logout_with_event_socket():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = find_event(c1.DoGetEvents(), tbmatch.event_pb2.Event.E_LOBBY_JOIN).lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    c2 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    request.code = code
+    c2.JoinLobbyByCode(request)
+
+    @tornado.gen.coroutine
+    def LogoutWithSocket():
+        request = tornado.httpclient.HTTPRequest('ws://localhost:1337/_01/events',
+                                                 headers={ 'Cookie' : 'session=' + c2.session.cookies['session'] })
+        socket = yield tornado.websocket.websocket_connect(request)
+        yield socket.read_message()
+
+        # logging out closes the socket and leaves the lobby, whose leave event has
+        # nowhere to go.
+        c2.Logout()
+        while (yield socket.read_message()) is not None:
+            pass
+
+    tornado.ioloop.IOLoop.current().run_sync(LogoutWithSocket, timeout=5)
+
+    # everyone else still hears about it.
+    updates = [e.lobby_update for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert updates[-1].removed
+
+def find_event(events, event_type):
+    for event in events:
+        if event.type == event_type:
+            return event
+
+if __name__ == '__main__':
+    test_get_event_waits_for_event()
@@ -1,5 +1,19 @@
+import time
+import socket
+import struct
 import game_client
+import tbmatch.event_pb2
 import tbmatch.lobby_pb2
+import tbmatch.match_pb2
+import tbmatch.session_pb2
+
+PORTAL_VERSION = 0x8012
+MSG_HANDSHAKE_REQUEST = 106
+MSG_HANDSHAKE_REPORT = 108
+MSG_VARIANT_CHANGE_REQUEST = 115
+MSG_GOODBYE = 127
+HANDSHAKE_OK = 0
+HANDSHAKE_HIGH_PING = 2
 
 
 def test_create_lobby():
@@ -31,4 +45,275 @@ def test_join_lobby_code():
     request.code = "test"
     c.JoinLobbyByCode(request)
 
-    c.DoGetEvents()
\ No newline at end of file
+    c.DoGetEvents()
+
+def test_join_lobby_code_ignores_case():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    c2 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    request.code = code.lower()
+    c2.JoinLobbyByCode(request)
+    joins = [e for e in c2.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN]
+    assert joins[0].lobby_join.lobby.lobby_id == lobby_id
+
+def test_lobby_updates_only_carry_changes():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    c2 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    request.code = code
+    c2.JoinLobbyByCode(request)
+
+    # the one joining gets the whole lobby...
+    lobby = [e for e in c2.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby
+    assert lobby.lobby_id == lobby_id
+    assert len(lobby.member) == 2
+    assert len(lobby.queue) == 2
+    c2_id = lobby.queue[1]
+
+    # ...and everyone else just hears about them.
+    update = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE][-1].lobby_update
+    assert [m.account_id for m in update.update] == [c2_id]
+    assert list(update.queue) == list(lobby.queue)
+
+    request = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    request.ready = True
+    c2.LobbySetReady(request)
+    update = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE][-1].lobby_update
+    assert [(m.account_id, m.ready) for m in update.update] == [(c2_id, True)]
+    assert len(update.queue) == 0
+
+def test_leave_lobby_when_not_in_one():
+    c = game_client.GameClient()
+    c.LeaveLobby()
+
+    # the last one out closes the lobby, after which leaving again does nothing.
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c.CreateLobby(request)
+    c.LeaveLobby()
+    c.LeaveLobby()
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_LEAVE for e in c.DoGetEvents())
+
+def test_joining_another_lobby_leaves_the_first():
+    joins = []
+    for c in (game_client.GameClient(), game_client.GameClient()):
+        request = tbmatch.lobby_pb2.CreateLobbyRequest()
+        request.type = tbmatch.lobby_pb2.LT_QUEUED
+        c.CreateLobby(request)
+        request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+        request.lobby_id = [e for e in c.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+        join = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+        join.code = c.GetLobbyJoinCode(request).join_code
+        joins.append((c, join))
+    (c1, join1), (c2, join2) = joins
+
+    c3 = game_client.GameClient()
+    c3.JoinLobbyByCode(join1)
+    c3_id = [e for e in c3.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.queue[-1]
+
+    # joining the second lobby takes them out of the first...
+    c3.JoinLobbyByCode(join2)
+    updates = [e.lobby_update for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].removed) == [c3_id]
+    assert list(updates[-1].queue) == [updates[0].queue[0]]
+
+    # ...and leaving takes them out of the second.
+    c3.LeaveLobby()
+    updates = [e.lobby_update for e in c2.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].removed) == [c3_id]
+    assert len(updates[-1].queue) == 1
+
+
+def test_full_lobby_makes_room_when_someone_logs_out():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    # fill the lobby up to LobbyConfig.max_members
+    join = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    join.code = code
+    members = [c1]
+    for _ in range(7):
+        c = game_client.GameClient()
+        c.JoinLobbyByCode(join)
+        members.append(c)
+    last = [e for e in members[-1].DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby
+    assert len(last.member) == 8
+    last_id = last.queue[-1]
+
+    # no room for one more.  they're turned away and end up in their own lobby instead.
+    c9 = game_client.GameClient()
+    c9.JoinLobbyByCode(join)
+    leaves = [e.lobby_leave for e in c9.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_LEAVE]
+    assert [(l.lobby_id, l.reason) for l in leaves] == [(lobby_id, tbmatch.event_pb2.LobbyLeaveEvent.REMOVED)]
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c9.CreateLobby(request)
+    joins = [e.lobby_join.lobby.lobby_id for e in c9.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN]
+    assert lobby_id not in joins
+
+    # logging out leaves the lobby, which makes room.
+    members[-1].Logout()
+    updates = [e.lobby_update for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].removed) == [last_id]
+
+    c10 = game_client.GameClient()
+    c10.JoinLobbyByCode(join)
+    joins = [e.lobby_join.lobby.lobby_id for e in c10.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN]
+    assert joins == [lobby_id]
+
+def test_lobby_drops_member_when_their_ticket_is_redeemed_again():
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    join = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    join.code = c1.GetLobbyJoinCode(request).join_code
+    c2 = game_client.GameClient()
+    c2.JoinLobbyByCode(join)
+    c2_id = [e for e in c2.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.queue[-1]
+
+    # the new session replaces the old one, which can't stay in the lobby.
+    request = tbmatch.session_pb2.RedeemGameSessionTicketRequest()
+    request.nonce = c2.session.cookies['session']
+    request.build_version = '1728'
+    request.game = tbmatch.session_pb2.GT_RISING_THUNDER
+    c2.RedeemGameSessionTicket(request)
+    updates = [e.lobby_update for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].removed) == [c2_id]
+
+def test_lobby_rotates_queue_after_match():
+    c1, c2, c3 = join_ready_lobby(3)
+    queue = list([e for e in c3.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.queue)
+
+    # their handshake fails.
+    sockets = connect_to_lobby_match((c1, c2))
+    time.sleep(0.5)
+    send_to_portal(sockets, MSG_HANDSHAKE_REPORT, struct.pack('<BHHH', HANDSHAKE_HIGH_PING, 0, 0, 0))
+    time.sleep(0.5)
+
+    # the match never finished, so both go to the back and the next two play.
+    events = c3.DoGetEvents()
+    updates = [e.lobby_update for e in events if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].queue) == queue[2:] + queue[:2]
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in events)
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in c1.DoGetEvents())
+
+def test_lobby_starts_next_match_after_disconnect():
+    c1, c2, c3 = join_ready_lobby(3)
+    queue = list([e for e in c3.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.queue)
+
+    # the handshake goes fine, then both players go quiet mid-game.
+    sockets = connect_to_lobby_match((c1, c2))
+    time.sleep(0.5)
+    send_to_portal(sockets, MSG_HANDSHAKE_REPORT, struct.pack('<BHHH', HANDSHAKE_OK, 0, 0, 0))
+    time.sleep(3)
+
+    assert any(e.type == tbmatch.event_pb2.Event.E_MATCH_ABANDONED for e in c1.DoGetEvents())
+    events = c3.DoGetEvents()
+    updates = [e.lobby_update for e in events if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].queue) == queue[2:] + queue[:2]
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in events)
+
+def test_lobby_winner_stays_on():
+    c1, c2, c3 = join_ready_lobby(3)
+    queue = list([e for e in c3.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.queue)
+
+    sockets = connect_to_lobby_match((c1, c2))
+    time.sleep(0.5)
+    send_to_portal(sockets, MSG_HANDSHAKE_REPORT, struct.pack('<BHHH', HANDSHAKE_OK, 0, 0, 0))
+    time.sleep(0.5)
+
+    # p1 wins two straight games, picking the same variants in between.
+    report = tbmatch.match_pb2.GameReport()
+    report.win_slot = 0
+    goodbye = report.SerializeToString()
+    send_to_portal(sockets, MSG_GOODBYE, struct.pack('H', len(goodbye)) + goodbye)
+    time.sleep(0.5)
+    send_to_portal(sockets, MSG_VARIANT_CHANGE_REQUEST, struct.pack('H', 0))
+    time.sleep(0.5)
+    send_to_portal(sockets, MSG_GOODBYE, struct.pack('H', len(goodbye)) + goodbye)
+    time.sleep(0.5)
+
+    # the loser goes to the back and the winner plays whoever was next.
+    events = c1.DoGetEvents()
+    assert any(e.type == tbmatch.event_pb2.Event.E_MATCH_OVER for e in events)
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in events)
+    events = c3.DoGetEvents()
+    updates = [e.lobby_update for e in events if e.type == tbmatch.event_pb2.Event.E_LOBBY_UPDATE]
+    assert list(updates[-1].queue) == [queue[0], queue[2], queue[1]]
+    assert any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in events)
+    events = c2.DoGetEvents()
+    assert any(e.type == tbmatch.event_pb2.Event.E_MATCH_OVER for e in events)
+    assert not any(e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START for e in events)
+
+def join_ready_lobby(count):
+    """
+    Create a lobby with count players in it, all ready.  The first two in the queue
+    are sent to a match.
+    """
+    c1 = game_client.GameClient()
+    request = tbmatch.lobby_pb2.CreateLobbyRequest()
+    request.type = tbmatch.lobby_pb2.LT_QUEUED
+    c1.CreateLobby(request)
+    lobby_id = [e for e in c1.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_JOIN][0].lobby_join.lobby.lobby_id
+
+    request = tbmatch.lobby_pb2.GetLobbyJoinCodeRequest()
+    request.lobby_id = lobby_id
+    code = c1.GetLobbyJoinCode(request).join_code
+
+    join = tbmatch.lobby_pb2.JoinLobbyByCodeRequest()
+    join.code = code
+    clients = [c1]
+    for _ in range(count - 1):
+        c = game_client.GameClient()
+        c.JoinLobbyByCode(join)
+        clients.append(c)
+
+    ready = tbmatch.lobby_pb2.LobbySetReadyRequest()
+    ready.ready = True
+    for c in clients:
+        c.LobbySetReady(ready)
+    return clients
+
+def connect_to_lobby_match(clients):
+    sockets = []
+    for c in clients:
+        start = [e.lobby_match_start for e in c.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_LOBBY_MATCH_START][0]
+        addr = (start.endpoint.server.host_name, start.endpoint.server.port)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_HANDSHAKE_REQUEST) + struct.pack('<QIHIIIIH', start.endpoint.secret, 1, 0, 0, 0, 0, 0, 0), addr)
+        sockets.append((sock, addr))
+    return sockets
+
+def send_to_portal(sockets, msg, payload):
+    for sock, addr in sockets:
+        sock.sendto(struct.pack('HB', PORTAL_VERSION, msg) + payload, addr)
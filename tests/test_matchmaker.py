@@ -1,7 +1,16 @@
 import time
+import socket
+import struct
 import tbmatch.event_pb2
 import game_client
 
+PORTAL_VERSION = 0x8012
+MSG_PING_READY = 67
+MSG_PING = 68
+MSG_HANDSHAKE_REQUEST = 106
+MSG_HANDSHAKE_REPORT = 108
+HANDSHAKE_HIGH_PING = 2
+
 def test_matchmaking_loop():
     c1 = game_client.GameClient()
     c2 = game_client.GameClient()
@@ -10,11 +19,108 @@ def test_matchmaking_loop():
     c1.GetMatch(get_match_request)
     c2.GetMatch(get_match_request)
 
-    # wait for at least 1 poll to happen
-    time.sleep(6)
+    # joining the queue kicks off a poll, so this shouldn't take long.
+    time.sleep(1)
+
+    assert check_client_events(c1) and check_client_events(c2)
+
+def test_join_queue_twice():
+    c = game_client.GameClient()
+
+    # joining again while already waiting shouldn't get us matched against ourselves.
+    get_match_request = tbmatch.match_pb2.GetMatchRequest()
+    c.GetMatch(get_match_request)
+    c.GetMatch(get_match_request)
+    time.sleep(1)
+
+    c.CancelGetMatch()
+    events = c.DoGetEvents()
+    assert not any(is_match_event(event) for event in events)
+    assert all(event.wait_match_progress.users_waiting >= 1 for event in events if is_wait_event(event))
+
+def test_ping_test_reports_latency():
+    c = game_client.GameClient()
+    config = c.PingTest().config
+    addr = (config.server.host_name, config.server.port)
 
+    # answer every ping until the server is done with us.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(1)
+    sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_PING_READY) + struct.pack('QH', config.secret, 1), addr)
+    try:
+        while True:
+            data, _ = sock.recvfrom(2048)
+            client_rand, server_rand = struct.unpack('HH', data[3:])
+            sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_PING) + struct.pack('HH', client_rand + 1, server_rand), addr)
+    except socket.timeout:
+        pass
+
+    complete = [e.ping_test_complete for e in c.DoGetEvents() if e.type == tbmatch.event_pb2.Event.E_PING_TEST_COMPLETE]
+    assert len(complete) == 1
+    assert complete[0].success
+    assert complete[0].loss_ratio == 0
+    assert complete[0].max_rtt_ms >= complete[0].avg_rtt_ms
+
+def test_no_immediate_rematch():
+    c1 = game_client.GameClient()
+    c2 = game_client.GameClient()
+
+    get_match_request = tbmatch.match_pb2.GetMatchRequest()
+    c1.GetMatch(get_match_request)
+    c2.GetMatch(get_match_request)
+    time.sleep(1)
     assert check_client_events(c1) and check_client_events(c2)
 
+    # straight back into the queue.  they just played, so they have to wait for
+    # someone else.
+    c1.GetMatch(get_match_request)
+    c2.GetMatch(get_match_request)
+    time.sleep(1)
+    for c in (c1, c2):
+        assert not any(is_match_event(e) for e in c.DoGetEvents())
+        c.CancelGetMatch()
+
+def test_failed_handshake_resumes_queue():
+    c1 = game_client.GameClient()
+    c2 = game_client.GameClient()
+
+    get_match_request = tbmatch.match_pb2.GetMatchRequest()
+    c1.GetMatch(get_match_request)
+    c2.GetMatch(get_match_request)
+    time.sleep(1)
+
+    # connect to the portal, then both report that the ping between us is too high.
+    sockets = []
+    for c in (c1, c2):
+        match = [e.wait_match_progress for e in c.DoGetEvents() if is_match_event(e)][0]
+        addr = (match.endpoint.server.host_name, match.endpoint.server.port)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_HANDSHAKE_REQUEST) + struct.pack('<QIHIIIIH', match.endpoint.secret, 1, 0, 0, 0, 0, 0, 0), addr)
+        sockets.append((sock, addr))
+    time.sleep(0.5)
+    for sock, addr in sockets:
+        sock.sendto(struct.pack('HB', PORTAL_VERSION, MSG_HANDSHAKE_REPORT) + struct.pack('<BHHH', HANDSHAKE_HIGH_PING, 0, 0, 0), addr)
+    time.sleep(0.5)
+
+    for c in (c1, c2):
+        assert any(e.type == tbmatch.event_pb2.Event.E_MATCH_ABANDONED for e in c.DoGetEvents())
+
+    # both get their place back, but aren't matched with each other again.
+    c1.ResumeGetMatch()
+    c2.ResumeGetMatch()
+    time.sleep(1)
+    for c in (c1, c2):
+        events = c.DoGetEvents()
+        assert any(is_wait_event(e) for e in events)
+        assert not any(is_match_event(e) for e in events)
+        c.CancelGetMatch()
+
+def test_resume_without_ticket():
+    c = game_client.GameClient()
+    c.ResumeGetMatch()
+    events = c.DoGetEvents()
+    assert any(e.wait_match_progress.status == tbmatch.event_pb2.WaitMatchProgressEvent.TIMEOUT for e in events)
+
 def check_client_events(client):
     found_waiting_event = False
     found_match_event = False
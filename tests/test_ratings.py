@@ -0,0 +1,58 @@
+import math
+import pytest
+import server
+import server.config
+import server.models.users
+import server.models.ratings
+
+UPDATES = [server.models.ratings.UpdateRatingsPython]
+if server.models.ratings.numpy:
+    UPDATES.append(server.models.ratings.UpdateRatingsNumpy)
+
+
+@pytest.fixture
+def glickman_tau(monkeypatch):
+    # the worked example in Glickman, "Example of the Glicko-2 system" uses tau 0.5.
+    monkeypatch.setattr(server.config.match_service_config.rating_config, 'tau', 0.5)
+
+
+@pytest.mark.parametrize('update', UPDATES)
+def test_update_matches_glickman_example(glickman_tau, update):
+    # a 1500 player beats a 1400, then loses to a 1550 and a 1700.
+    ratings = [1500.0, 1400.0, 1550.0, 1700.0]
+    deviations = [200.0, 30.0, 100.0, 300.0]
+    volatilities = [0.06] * 4
+    results = [(0, 1, 1.0), (1, 0, 0.0), (0, 2, 0.0), (2, 0, 1.0), (0, 3, 0.0), (3, 0, 1.0)]
+    ratings, deviations, volatilities = update(ratings, deviations, volatilities, results)
+    assert abs(ratings[0] - 1464.05) < 0.01
+    assert abs(deviations[0] - 151.52) < 0.01
+    assert abs(volatilities[0] - 0.05999) < 0.00001
+
+
+@pytest.mark.parametrize('update', UPDATES)
+def test_player_without_games_only_gets_less_certain(update):
+    ratings, deviations, volatilities = update([1500.0, 1700.0], [200.0, 60.0], [0.06, 0.05], [])
+    decay = server.models.ratings.GetInactiveDeviationIncrease()
+    assert ratings == [1500.0, 1700.0]
+    assert volatilities == [0.06, 0.05]
+    assert abs(deviations[0] - math.sqrt(200.0 ** 2 + decay)) < 1e-9
+    assert abs(deviations[1] - math.sqrt(60.0 ** 2 + decay)) < 1e-9
+
+
+def test_results_count_after_a_player_logs_out(monkeypatch):
+    ratings = server.models.ratings.Ratings()
+    monkeypatch.setattr(server, 'ratings', ratings)
+    winner = server.models.users.User()
+    loser = server.models.users.User()
+    start = winner.rating
+    ratings.AddMatchResult(winner, loser, 1.0)
+
+    # the loser logs out before the period ends.
+    loser.session_key = 'logged out'
+    server.users.users[loser.session_key] = loser
+    server.users.EndSession(loser.session_key)
+
+    ratings.RunRatingPeriod()
+    assert winner.rating > start
+    assert loser.rating < start
+    assert ratings.players.keys() == [winner.user_id]